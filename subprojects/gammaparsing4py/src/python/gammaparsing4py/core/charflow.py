@@ -1,4 +1,33 @@
-from io import StringIO, TextIOBase
+import codecs
+from collections import deque
+from io import TextIOBase
+import mmap
+import os
+from typing import AsyncIterator, Union
+
+from gammaparsing4py.core.positions import LineIndex
+
+
+def mapFile(path: str) -> Union[mmap.mmap, bytes]:
+    """
+    Maps the given file in memory for reading, the mapping being released once it
+    is no longer referenced. Empty files, which can't be mapped, give empty bytes
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+async def readBlocks(reader, blockSize: int) -> AsyncIterator[bytes]:
+    """
+    Async iterator over the blocks read from a reader such as an asyncio.StreamReader
+    """
+    while True:
+        block = await reader.read(blockSize)
+        if len(block) == 0:
+            return
+        yield block
 
 
 class CharFlow:
@@ -7,10 +36,21 @@ class CharFlow:
         self.reader: TextIOBase = reader
 
         self.current: int = None
-        self.line: int = 0
-        self.column: int = 0
+        self.stack: deque[int] = deque()
+        self.offset: int = 0
+        self.positions: LineIndex = LineIndex()
+
+        self.source: str = None
+        self.record: list[str] = None
+        self.marked: int = None
+
+        # Encoding of the served units, None if they are code points
+        self.encoding: str = None
 
     def peek(self):
+        if self.stack:
+            return self.stack[-1]
+
         if self.current is None:
             obtained: str = self.reader.read(1)
             if len(obtained) == 1:
@@ -20,6 +60,14 @@ class CharFlow:
 
         return self.current
 
+    @property
+    def line(self) -> int:
+        return self.positions.position(self.offset)[0]
+
+    @property
+    def column(self) -> int:
+        return self.positions.position(self.offset)[1]
+
     def read(self, target: int):
         if not self.hasMore():
             raise Exception(
@@ -47,9 +95,12 @@ class CharFlow:
         This functions assumes that the pushed character is not a newline
         """
         assert target != 10
-        self.column -= 1
+        self.offset -= 1
         self.stack.append(target)
 
+        if self.record:
+            self.record.pop()
+
     def check(self, target: int):
         if self.hasMore() and self.peek() == target:
             self._step()
@@ -68,17 +119,48 @@ class CharFlow:
         return result
 
     def _step(self):
-        if self.peek() == 10:
-            self.line += 1
-            self.column = 0
-        else:
-            self.column += 1
+        code = self.peek()
+        if code == 10:
+            self.positions.add(self.offset)
 
-        self.current = None
+        self.offset += 1
+        if self.record is not None:
+            self.record.append(chr(code))
+
+        if self.stack:
+            self.stack.pop()
+        else:
+            self.current = None
 
     def hasMore(self):
         return self.peek() >= 0
 
+    def mark(self) -> int:
+        """
+        Marks the current offset, returning it. Text located after the last marked
+        offset stays available through the slice method
+        """
+        self.marked = self.offset
+        self.record = []
+        return self.marked
+
+    def slice(self, start: int, end: int) -> str:
+        return "".join(self.record)[start - self.marked : end - self.marked]
+
+    def rewind(self, offset: int):
+        """
+        Moves back to the given offset, which must be located after the last marked
+        offset
+        """
+        while self.offset > offset:
+            self.stack.append(ord(self.record.pop()))
+            self.offset -= 1
+
+        newlines = self.positions.newlines
+        while newlines and newlines[-1] >= offset:
+            newlines.pop()
+        self.positions.scanned = offset
+
     def skipBlanks(self):
         while self.hasMore() and chr(self.peek()).isspace():
             self.next()
@@ -120,4 +202,296 @@ class CharFlow:
         return wrapped
 
     def fromString(target: str):
-        return CharFlow(StringIO(target))
+        return BufferedCharFlow.fromString(target)
+
+    def fromFile(path: str):
+        return MappedCharFlow.fromFile(path)
+
+
+class BufferedCharFlow(CharFlow):
+    """
+    CharFlow reading its input by large blocks and serving characters by index
+    into an in-memory buffer. Pushed back characters which differ from the ones read
+    are served from the pushback stack first
+    """
+
+    BLOCK_SIZE: int = 1 << 16
+
+    def __init__(self, reader: TextIOBase, blockSize: int = BLOCK_SIZE):
+        self.buffer: str = ""
+        self.index: int = 0
+        self.origin: int = 0
+
+        # Blocks read after the buffer by scanners, see block, and offset of the end
+        # of the data read so far
+        self.blocks: list[str] = []
+        self.length: int = 0
+
+        CharFlow.__init__(self, reader)
+        self.blockSize: int = blockSize
+
+    @property
+    def offset(self) -> int:
+        return self.origin + self.index - len(self.stack)
+
+    @offset.setter
+    def offset(self, offset: int):
+        self.rewind(offset)
+
+    def _read(self) -> bool:
+        """
+        Reads a new block after the buffer and the blocks read before
+        """
+        if self.reader is None:
+            return False
+
+        obtained: str = self.reader.read(self.blockSize)
+        if len(obtained) == 0:
+            self.reader = None
+            return False
+
+        self.positions.feed(obtained, self.length)
+        self.blocks.append(obtained)
+        self.length += len(obtained)
+        return True
+
+    def _fill(self) -> bool:
+        if len(self.blocks) == 0 and not self._read():
+            return False
+
+        # Characters located after the marked offset must be kept
+        kept = self.index
+        if self.marked is not None:
+            kept = min(kept, self.marked - self.origin)
+
+        self.buffer = self.buffer[kept:] + "".join(self.blocks)
+        self.blocks.clear()
+        self.index -= kept
+        self.origin += kept
+        return True
+
+    def block(self, offset: int) -> str:
+        """
+        Returns the data from the given offset up to the end of the buffer or of the
+        block read after it which contains the offset, reading a new block if the
+        offset ends the data read so far. The result is empty at the end of the data
+        """
+        if offset == self.length:
+            if self._read():
+                return self.blocks[-1]
+            return self.buffer[:0]
+
+        # Scanners mostly ask for the last block
+        start = self.length
+        for block in reversed(self.blocks):
+            start -= len(block)
+            if offset >= start:
+                return block[offset - start :]
+
+        return self.buffer[offset - self.origin :]
+
+    def peek(self):
+        if self.stack:
+            return self.stack[-1]
+
+        if self.index >= len(self.buffer) and not self._fill():
+            return -1
+
+        return ord(self.buffer[self.index])
+
+    def hasMore(self):
+        return self.index < len(self.buffer) or len(self.stack) > 0 or self._fill()
+
+    def check(self, target: int):
+        if self.stack:
+            return CharFlow.check(self, target)
+
+        if self.index >= len(self.buffer) and not self._fill():
+            return False
+
+        if ord(self.buffer[self.index]) != target:
+            return False
+
+        self._step()
+        return True
+
+    def next(self):
+        if self.stack:
+            return self.stack.pop()
+
+        if self.index >= len(self.buffer) and not self._fill():
+            raise Exception(
+                "At line {}, column {}, tried to step but got end of stream".format(
+                    self.line, self.column
+                )
+            )
+        result = ord(self.buffer[self.index])
+        self.index += 1
+        return result
+
+    def _step(self):
+        if self.stack:
+            self.stack.pop()
+        else:
+            self.index += 1
+
+    def push(self, target: int):
+        """
+        This functions assumes that the pushed character is not a newline. Moving
+        back over the buffer when possible, slices only give the buffered text
+        """
+        assert target != 10
+
+        if (
+            not self.stack
+            and self.index > 0
+            and ord(self.buffer[self.index - 1]) == target
+        ):
+            self.index -= 1
+        else:
+            self.stack.append(target)
+
+    def mark(self) -> int:
+        self.marked = self.offset
+        return self.marked
+
+    def slice(self, start: int, end: int) -> str:
+        return self.buffer[start - self.origin : end - self.origin]
+
+    def rewind(self, offset: int):
+        self.stack.clear()
+        if offset - self.origin > len(self.buffer):
+            self._fill()
+        self.index = offset - self.origin
+
+    def fromString(target: str):
+        flow = BufferedCharFlow(None)
+        flow.buffer = target
+        flow.length = len(target)
+        flow.source = target
+        flow.positions = LineIndex(target)
+        return flow
+
+
+class MappedCharFlow(BufferedCharFlow):
+    """
+    CharFlow serving the bytes of UTF-8 data in place, typically a memory-mapped
+    file, to be scanned by byte-level automata, see Tokenizer.utf8. Offsets are byte
+    offsets, slices are bytes and the data is the source of the tokens, so that their
+    text is only decoded on demand. Slicing the data, as slice and Token.data do,
+    copies the sliced bytes, Token.view being the zero-copy access
+    """
+
+    def __init__(self, data: Union[mmap.mmap, bytes]):
+        BufferedCharFlow.__init__(self, None)
+        self.buffer: Union[mmap.mmap, bytes] = data
+        self.length: int = len(data)
+        self.source: Union[mmap.mmap, bytes] = data
+        self.positions: LineIndex = LineIndex(data)
+        self.encoding: str = "utf-8"
+
+    def peek(self):
+        if self.index >= len(self.buffer):
+            return -1
+
+        return self.buffer[self.index]
+
+    def hasMore(self):
+        return self.index < len(self.buffer)
+
+    def check(self, target: int):
+        if self.index >= len(self.buffer) or self.buffer[self.index] != target:
+            return False
+
+        self.index += 1
+        return True
+
+    def next(self):
+        if self.index >= len(self.buffer):
+            raise Exception(
+                "At line {}, column {}, tried to step but got end of stream".format(
+                    self.line, self.column
+                )
+            )
+        result = self.buffer[self.index]
+        self.index += 1
+        return result
+
+    def push(self, target: int):
+        """
+        Only the last byte read can be pushed back, the data being left untouched
+        """
+        if self.index == 0 or self.buffer[self.index - 1] != target:
+            raise Exception("Unable to push {} back onto mapped data".format(target))
+
+        self.index -= 1
+
+    def fromFile(path: str):
+        return MappedCharFlow(mapFile(path))
+
+
+class AsyncCharFlow(BufferedCharFlow):
+    """
+    CharFlow over an asyncio.StreamReader, or any async iterator of bytes or str
+    chunks, bytes being decoded incrementally. Characters are only served from the
+    data received so far: reaching its end marks the flow as starved instead of
+    blocking, readers then being expected to wait for more data with receive and
+    try again, see Tokenizer.asyncIterator
+    """
+
+    def __init__(
+        self,
+        reader: Union[AsyncIterator[bytes], AsyncIterator[str]],
+        blockSize: int = BufferedCharFlow.BLOCK_SIZE,
+        encoding: str = "utf-8",
+    ):
+        BufferedCharFlow.__init__(self, None, blockSize)
+
+        self.chunks: Union[AsyncIterator[bytes], AsyncIterator[str]] = (
+            readBlocks(reader, blockSize) if hasattr(reader, "read") else reader
+        )
+        self.decoder: codecs.IncrementalDecoder = codecs.getincrementaldecoder(
+            encoding
+        )()
+
+        self.ended: bool = False
+        self.starved: bool = False
+
+    def _read(self) -> bool:
+        if not self.ended:
+            self.starved = True
+        return False
+
+    def block(self, offset: int) -> str:
+        """
+        Returns None instead of an empty block if more data is to be received
+        """
+        block = BufferedCharFlow.block(self, offset)
+        if len(block) == 0 and self.starved:
+            return None
+        return block
+
+    async def receive(self) -> bool:
+        """
+        Waits for more data, which is kept as a block until read. Returns False if
+        the stream has ended instead
+        """
+        obtained = ""
+        while len(obtained) == 0 and not self.ended:
+            try:
+                chunk = await self.chunks.__anext__()
+            except StopAsyncIteration:
+                self.ended = True
+                obtained = self.decoder.decode(b"", True)
+                break
+
+            obtained = chunk if isinstance(chunk, str) else self.decoder.decode(chunk)
+
+        self.starved = False
+        if len(obtained) == 0:
+            return False
+
+        self.positions.feed(obtained, self.length)
+        self.blocks.append(obtained)
+        self.length += len(obtained)
+        return True
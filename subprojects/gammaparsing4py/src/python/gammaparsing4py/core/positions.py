@@ -0,0 +1,62 @@
+from bisect import bisect_left
+
+
+class LineIndex:
+    """
+    Sorted index of newline offsets, built incrementally, used to resolve
+    absolute offsets into line and column numbers on demand
+    """
+
+    def __init__(self, source: str = None):
+        self.source: str = source
+        self.newlines: list[int] = []
+        self.scanned: int = 0
+
+    def feed(self, text: str, origin: int = 0, end: int = None):
+        """
+        Indexes the newlines of the given text, whose first character is located at
+        the absolute offset origin, up to the absolute offset end
+        """
+        newline = "\n" if isinstance(text, str) else b"\n"
+        stop = len(text) if end is None else end - origin
+
+        index = text.find(newline, max(self.scanned - origin, 0), stop)
+        while index >= 0:
+            self.newlines.append(origin + index)
+            index = text.find(newline, index + 1, stop)
+
+        self.scanned = max(self.scanned, origin + stop)
+
+    def add(self, offset: int):
+        self.newlines.append(offset)
+        self.scanned = offset + 1
+
+    def edited(self, source: str, offset: int, removed: int, inserted: int):
+        """
+        Returns the index of source, the indexed source once the removed characters
+        located at offset are replaced by inserted characters, newlines indexed
+        after the edit being shifted instead of scanned again
+        """
+        index = LineIndex(source)
+        index.newlines = self.newlines[: bisect_left(self.newlines, offset)]
+        index.scanned = min(self.scanned, offset)
+
+        if self.scanned >= offset + removed:
+            index.feed(source, 0, offset + inserted)
+
+            shift = inserted - removed
+            following = bisect_left(self.newlines, offset + removed)
+            index.newlines.extend(map(shift.__add__, self.newlines[following:]))
+            index.scanned = self.scanned + shift
+
+        return index
+
+    def position(self, offset: int) -> tuple[int, int]:
+        if self.source is not None and offset > self.scanned:
+            self.feed(self.source, 0, offset)
+
+        line = bisect_left(self.newlines, offset)
+        if line == 0:
+            return 0, offset
+
+        return line, offset - self.newlines[line - 1] - 1
@@ -1,17 +1,159 @@
-from typing import Generic, TypeVar
+from array import array
+from bisect import bisect_left
+from typing import Generic, Iterator, TypeVar
+
+from gammaparsing4py.core.positions import LineIndex
 
 T = TypeVar("T")
 
 
 class Token(Generic[T]):
 
-    def __init__(self, key: T, data: str, line: int, column: int):
+    __slots__ = (
+        "key",
+        "_data",
+        "_line",
+        "_column",
+        "start",
+        "end",
+        "source",
+        "positions",
+    )
+
+    def __init__(
+        self,
+        key: T,
+        data: str,
+        line: int,
+        column: int,
+        start: int = None,
+        end: int = None,
+        source: str = None,
+        positions: LineIndex = None,
+    ):
         self.key: T = key
-        self.data: str = data
-        self.line: int = line
-        self.column: int = column
+        self._data: str = data
+        self._line: int = line
+        self._column: int = column
+
+        self.start: int = start
+        self.end: int = end
+        self.source: str = source
+        self.positions: LineIndex = positions
+
+    def _resolvePosition(self):
+        self._line, self._column = self.positions.position(self.start)
+
+    @property
+    def line(self) -> int:
+        if self._line is None and self.positions is not None:
+            self._resolvePosition()
+        return self._line
+
+    @property
+    def column(self) -> int:
+        if self._column is None and self.positions is not None:
+            self._resolvePosition()
+        return self._column
+
+    @property
+    def data(self) -> str:
+        if self._data is None and self.source is not None:
+            if isinstance(self.source, str):
+                self._data = self.source[self.start : self.end]
+            else:
+                self._data = str(self.view, "utf-8")
+
+        return self._data
+
+    @property
+    def view(self) -> memoryview:
+        """
+        Zero-copy view over the token content, only available for bytes-like sources
+        """
+        return memoryview(self.source)[self.start : self.end]
 
     def __repr__(self) -> str:
         return "Token(key={}, data={}, line={}, column={})".format(
             repr(self.key), repr(self.data), self.line, self.column
         )
+
+
+def keepAll(token: Token) -> bool:
+    """
+    Default skipper, keeping every token
+    """
+    return False
+
+
+class TokenBuffer(Generic[T]):
+    """
+    Columnar storage of a token stream: terminal ids and offsets are stored in arrays,
+    Token objects are only created when items are accessed. Key id 0 is the end of
+    data key, whose tokens have no data, as when they are read from a flow
+    """
+
+    def __init__(self, keys: list[T], source: str = None, positions: LineIndex = None):
+        self.keys: list[T] = keys
+        self.source: str = source
+        self.positions: LineIndex = positions
+
+        self.ids: array[int] = array("i")
+        self.starts: array[int] = array("q")
+        self.ends: array[int] = array("q")
+
+        # Offset up to which the scanner had read when each token was recorded,
+        # exclusive, the end of the data counting as a character. Only filled by bulk
+        # tokenization, it tells which tokens an edit can affect
+        self.reaches: array[int] = array("q")
+
+        # Token contents are only stored when they can't be sliced from the source
+        self.texts: list[str] = [] if source is None else None
+
+    def append(self, keyId: int, start: int, end: int, data: str = None):
+        self.ids.append(keyId)
+        self.starts.append(start)
+        self.ends.append(end)
+
+        if self.texts is not None:
+            self.texts.append(data)
+
+    def boundary(self, offset: int) -> int:
+        """
+        Returns the index of the first token located after the given offset if the
+        scanner started reading there, -1 otherwise
+        """
+        index = bisect_left(self.starts, offset)
+
+        if index < len(self.starts) and self.starts[index] == offset:
+            return index
+        if index > 0 and self.ends[index - 1] == offset:
+            return index
+        return -1
+
+    def key(self, index: int) -> T:
+        return self.keys[self.ids[index]]
+
+    def data(self, index: int) -> str:
+        if self.texts is not None:
+            return self.texts[index]
+        return self[index].data
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> Token[T]:
+        keyId = self.ids[index]
+        return Token(
+            self.keys[keyId],
+            self.texts[index] if self.texts is not None else None,
+            None,
+            None,
+            self.starts[index],
+            self.ends[index],
+            self.source if keyId != 0 else None,
+            self.positions,
+        )
+
+    def __iter__(self) -> Iterator[Token[T]]:
+        return map(self.__getitem__, range(len(self.ids)))
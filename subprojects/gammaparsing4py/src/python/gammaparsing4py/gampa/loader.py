@@ -56,8 +56,14 @@ def loadGAMPA(inputStream: TextIOBase) -> tuple[Tokenizer[AbstractTerminal], Par
 
     parser = parserBuilder.build(rootSymbol)
 
-    tokenizer = tokenizerBuilder.build(SpecialTerminal.EOF())
-    tokenizer.skipper = lambda token: token.key.id is None
+    # Terminals unused by the rules, or tagged as such, are skipped
+    skipped: set[AbstractTerminal] = {
+        terminal
+        for _, terminal, _, _ in tokenizerBuilder.entries
+        if terminal.id is None or "SKIP" in terminal.tags
+    }
+
+    tokenizer = tokenizerBuilder.build(SpecialTerminal.EOF(), skipped=skipped)
 
     return tokenizer, parser
 
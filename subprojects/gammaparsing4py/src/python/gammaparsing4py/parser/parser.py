@@ -1,6 +1,6 @@
 from collections import deque
-from typing import Any, Callable, Iterable
-from gammaparsing4py.core.token import Token
+from typing import Any, AsyncIterable, Callable, Iterable
+from gammaparsing4py.core.token import Token, TokenBuffer
 from gammaparsing4py.parser.struct import Rule
 from gammaparsing4py.parser.symbols import AbstractTerminal, Symbol
 from gammaparsing4py.utils import PushbackIterator
@@ -32,6 +32,13 @@ class Parser:
         self.reducer: Callable[[Rule, list[Any]], Any] = lambda rule, data: None
 
     def parse(self, tokens: Iterable[Token[AbstractTerminal]]):
+        """
+        Parses a stream of tokens, token buffers being read by columns, see
+        _parseBuffer
+        """
+        if isinstance(tokens, TokenBuffer):
+            return self._parseBuffer(tokens)
+
         stateStack: deque[ParserState] = deque()
         dataStack: deque[Any] = deque()
         symbolStack: deque[Symbol] = deque()
@@ -41,20 +48,88 @@ class Parser:
         iterator = PushbackIterator(tokens)
 
         for token in iterator:
-            currentState = stateStack[-1]
+            result = self._act(token, stateStack, symbolStack, dataStack, iterator)
+            if result is not None:
+                return result
 
-            action = currentState.actions[token.key.id]
+    def _parseBuffer(self, buffer: TokenBuffer[AbstractTerminal]):
+        """
+        Parses the tokens of a buffer, actions being looked up from its key ids: a
+        Token is only created for shifted tokens, which are kept on the data stack.
+        From the first action which is neither a shift, a reduction nor an accept,
+        the remaining tokens are created and parsed as by parse
+        """
+        stateStack: deque[ParserState] = deque()
+        dataStack: deque[Any] = deque()
+        symbolStack: deque[Symbol] = deque()
 
-            if action is None:
+        stateStack.append(self.states[0])
 
-                raise Exception("Unexpected token {}".format(token))
+        keys = buffer.keys
+        terminalIds = [key.id for key in keys]
+        ids = buffer.ids
+        index = 0
+
+        while index < len(ids):
+            keyId = ids[index]
+            action = stateStack[-1].actions[terminalIds[keyId]]
+
+            if isinstance(action, ParserShiftAction):
+                stateStack.append(self.states[action.target])
+                dataStack.append(buffer[index])
+                symbolStack.append(keys[keyId])
+                index += 1
+            elif isinstance(action, ParserReduceAction):
+                action.reduce(self, stateStack, symbolStack, dataStack)
+            elif isinstance(action, ParserAcceptAction):
+                return dataStack.pop()
+            else:
+                break
+
+        iterator = PushbackIterator(map(buffer.__getitem__, range(index, len(ids))))
 
-            result = action.apply(
-                token, self, stateStack, symbolStack, dataStack, iterator
-            )
+        for token in iterator:
+            result = self._act(token, stateStack, symbolStack, dataStack, iterator)
             if result is not None:
                 return result
 
+    async def parseAsync(self, tokens: AsyncIterable[Token[AbstractTerminal]]):
+        """
+        Parses tokens received from an async iterable, such as the one of
+        Tokenizer.asyncIterator. Branching actions only see the tokens received so far
+        """
+        stateStack: deque[ParserState] = deque()
+        dataStack: deque[Any] = deque()
+        symbolStack: deque[Symbol] = deque()
+
+        stateStack.append(self.states[0])
+
+        iterator = PushbackIterator(iter(()))
+
+        async for received in tokens:
+            iterator.push(received)
+
+            for token in iterator:
+                result = self._act(token, stateStack, symbolStack, dataStack, iterator)
+                if result is not None:
+                    return result
+
+    def _act(
+        self,
+        token: Token[AbstractTerminal],
+        stateStack: deque[ParserState],
+        symbolStack: deque[Symbol],
+        dataStack: deque[Any],
+        iterator: PushbackIterator[Token[AbstractTerminal]],
+    ) -> Any:
+        action = stateStack[-1].actions[token.key.id]
+
+        if action is None:
+
+            raise Exception("Unexpected token {}".format(token))
+
+        return action.apply(token, self, stateStack, symbolStack, dataStack, iterator)
+
 
 class ParserAction:
 
@@ -135,6 +210,20 @@ class ParserReduceAction(ParserAction):
         dataStack: deque[Any],
         iterator: PushbackIterator[Token[AbstractTerminal]],
     ) -> Any:
+        self.reduce(parser, stateStack, symbolStack, dataStack)
+        iterator.push(token)
+
+    def reduce(
+        self,
+        parser: Parser,
+        stateStack: deque[ParserState],
+        symbolStack: deque[Symbol],
+        dataStack: deque[Any],
+    ):
+        """
+        Replaces the top of the stacks by the reduced non-terminal, the token which
+        triggered the reduction being left to the caller
+        """
         accumulator: deque[Any] = deque()
 
         currentNode = self.rule.reversedNodes[0]
@@ -152,7 +241,6 @@ class ParserReduceAction(ParserAction):
         stateStack.append(parser.states[stateStack[-1].gotos[self.rule.nonTerminal.id]])
         dataStack.append(parser.reducer(self.rule, list(reversed(accumulator))))
         symbolStack.append(self.rule.nonTerminal)
-        iterator.push(token)
 
     def __eq__(self, value: object) -> bool:
         return isinstance(value, ParserReduceAction) and self.rule == value.rule
@@ -0,0 +1,125 @@
+"""States of tokenizer automata followed through several characters by re"""
+
+import re
+from array import array
+from typing import Callable
+
+from gammaparsing4py.tokenizer.native import classSource
+from gammaparsing4py.tokenizer.regex import RegexRange
+from gammaparsing4py.tokenizer.table import TokenizerTable
+
+# Shortest literal worth following at once
+MIN_CHAIN_LENGTH = 2
+
+BYTE_LIMIT = 0x100
+
+
+def compileSource(source: str, binary: bool) -> Callable[[str, int], re.Match]:
+    if binary:
+        return re.compile(source.encode("ascii")).match
+    return re.compile(source).match
+
+
+def loopMatcher(
+    ranges: list[RegexRange], binary: bool
+) -> Callable[[str, int], re.Match]:
+    """
+    Returns the match function of the longest run of characters of the ranges, None
+    if bytes can't belong to them
+    """
+    if binary:
+        ranges = [
+            RegexRange(key.start, min(key.end, BYTE_LIMIT - 1))
+            for key in ranges
+            if key.start < BYTE_LIMIT
+        ]
+        if len(ranges) == 0:
+            return None
+
+    return compileSource(classSource(ranges) + "*", binary)
+
+
+def chainMatcher(literal: list[int], binary: bool) -> Callable[[str, int], re.Match]:
+    """
+    Returns the match function of the literal, None if bytes can't spell it
+    """
+    if binary and max(literal) >= BYTE_LIMIT:
+        return None
+
+    return compileSource(
+        "".join(classSource([RegexRange(code, code)]) for code in literal), binary
+    )
+
+
+class Accelerations:
+    """
+    Accelerated states of a tokenizer table, with the match functions of their
+    loop or of their literal
+    """
+
+    def __init__(self, numStates: int):
+        self.flags: array[int] = array("b", bytes(numStates))
+
+        self.loops: list[Callable[[str, int], re.Match]] = [None] * numStates
+        self.byteLoops: list[Callable[[bytes, int], re.Match]] = [None] * numStates
+
+        self.chains: list[tuple[Callable[[str, int], re.Match], int]] = [
+            None
+        ] * numStates
+        self.byteChains: list[tuple[Callable[[bytes, int], re.Match], int]] = [
+            None
+        ] * numStates
+
+    def select(self, source) -> tuple[list, list]:
+        """
+        Returns the loop and chain matchers suited to the given data
+        """
+        if isinstance(source, str):
+            return self.loops, self.chains
+        return self.byteLoops, self.byteChains
+
+    def of(rows: list[list[tuple[RegexRange, int]]], table: TokenizerTable):
+        """
+        Detects the accelerated states of a table, given the transitions of each
+        state as ranges leading to state ids. States which stop reading are never
+        accelerated
+        """
+        result = Accelerations(len(rows))
+
+        for state, row in enumerate(rows):
+            if table.stops[state]:
+                continue
+
+            # Looping states
+            loop = [key for key, target in row if target == state]
+            if len(loop) > 0:
+                result.flags[state] = True
+                result.loops[state] = loopMatcher(loop, False)
+                result.byteLoops[state] = loopMatcher(loop, True)
+                continue
+
+            # Chain states, followed until a state accepts or branches
+            literal: list[int] = []
+            current = state
+            visited: set[int] = {state}
+            while len(rows[current]) == 1 and not table.stops[current]:
+                key, target = rows[current][0]
+                if key.start != key.end or target in visited:
+                    break
+
+                literal.append(key.start)
+                visited.add(target)
+                current = target
+
+                if table.accepts[current] >= 0:
+                    break
+
+            if len(literal) >= MIN_CHAIN_LENGTH:
+                result.flags[state] = True
+                result.chains[state] = (chainMatcher(literal, False), current)
+
+                byteMatcher = chainMatcher(literal, True)
+                if byteMatcher is not None:
+                    result.byteChains[state] = (byteMatcher, current)
+
+        return result
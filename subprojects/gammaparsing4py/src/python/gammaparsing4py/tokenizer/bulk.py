@@ -0,0 +1,267 @@
+"""Tokenization of whole strings and bytes-like data into token buffers"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, TypeVar
+
+from gammaparsing4py.core.positions import LineIndex
+from gammaparsing4py.core.token import Token, TokenBuffer, keepAll
+from gammaparsing4py.tokenizer.accelerate import Accelerations
+from gammaparsing4py.tokenizer.scanner import longestMatches, unparsable
+from gammaparsing4py.tokenizer.table import FailureMemo, TokenizerTable
+
+T = TypeVar("T")
+
+
+def tokenizeSource(
+    tokenizer,
+    source,
+    classes=None,
+    position: int = 0,
+    buffer: TokenBuffer[T] = None,
+    previous: TokenBuffer[T] = None,
+    syncFrom: int = None,
+    shift: int = 0,
+    stop: int = None,
+    window: int = None,
+) -> TokenBuffer[T]:
+    """
+    Appends the tokens of source from position to buffer. Given previous, the
+    tokens of the data before an edit, scanning syncs with them from syncFrom up to
+    stop. Given a window, only the scanned characters are mapped, by blocks
+    """
+    table = tokenizer.table
+    length = len(source)
+
+    if window is not None:
+        end = position if syncFrom is None else max(position, syncFrom)
+        block = source[position : end + window]
+        matches = longestMatches(
+            table,
+            table.classIds(block),
+            position,
+            FailureMemo(table),
+            tokenizer.accelerate(),
+            block,
+            position,
+            lambda offset: nextBlock(table, source, offset, window),
+        )
+    else:
+        if classes is None:
+            classes = table.classIds(source)
+        matches = longestMatches(
+            table, classes, position, FailureMemo(table), tokenizer.accelerate(), source
+        )
+
+    keys = tokenizer.keys
+    reclassified = tokenizer.reclassified
+    discarded = tokenizer.discarded
+    skipper = tokenizer.skipper
+    filtered = skipper is not keepAll
+
+    if buffer is None:
+        buffer = TokenBuffer(keys, source, LineIndex(source))
+    positions = buffer.positions
+    ids = buffer.ids
+    starts = buffer.starts
+    ends = buffer.ends
+    reaches = buffer.reaches
+
+    if syncFrom is None:
+        syncFrom = length + 1
+
+    if stop is None:
+        stop = length
+
+    # Offset up to which the scanner has read, and the previous token from which
+    # the previous scanning is resumed
+    reached = max(position, reaches[-1]) if len(reaches) > 0 else position
+    synced = -1
+
+    while position < length:
+        if position >= syncFrom:
+            synced = previous.boundary(position - shift)
+            if synced >= 0 or position > stop:
+                break
+
+        accept, end, reach = next(matches)
+        if reach > reached:
+            reached = reach
+
+        if accept < 0:
+            text = source[position:end] or source[position : end + 1]
+            if not isinstance(text, str):
+                text = str(text, "utf-8", "replace")
+            raise unparsable(text, position, positions)
+
+        if accept in discarded:
+            position = end
+            continue
+
+        texts = reclassified[accept]
+        if texts is not None:
+            lexeme = source[position:end]
+            if not isinstance(lexeme, str):
+                lexeme = str(lexeme, "utf-8")
+            accept = texts.get(lexeme, accept)
+
+        if not filtered or not skipper(
+            Token(keys[accept], None, None, None, position, end, source, positions)
+        ):
+            ids.append(accept)
+            starts.append(position)
+            ends.append(end)
+            reaches.append(reached)
+
+        position = end
+
+    if synced >= 0:
+        splice(buffer, previous, synced, shift, reached)
+        return buffer
+
+    # Syncing gave up before the end of the data
+    if position < length:
+        return buffer
+
+    ids.append(0)
+    starts.append(length)
+    ends.append(length)
+    reaches.append(length + 1)
+
+    return buffer
+
+
+def nextBlock(table, source, offset: int, window: int) -> tuple:
+    """
+    Returns the class ids and the data of the block of source read from offset
+    """
+    block = source[offset : offset + window]
+    return table.classIds(block), block
+
+
+def splice(
+    buffer: TokenBuffer[T],
+    previous: TokenBuffer[T],
+    synced: int,
+    shift: int,
+    reached: int,
+):
+    """
+    Appends the tokens of the previous buffer from the given index, shifted
+    """
+    buffer.ids.extend(previous.ids[synced:])
+    buffer.starts.extend(map(shift.__add__, previous.starts[synced:]))
+    buffer.ends.extend(map(shift.__add__, previous.ends[synced:]))
+
+    # Reaches stay increasing, the ones below the new scanning being raised
+    raised = bisect_left(previous.reaches, reached - shift, synced)
+    buffer.reaches.extend([reached] * (raised - synced))
+    buffer.reaches.extend(map(shift.__add__, previous.reaches[raised:]))
+
+
+def skipTokens(buffer: TokenBuffer[T], skipper: Callable[[Token[T]], bool]):
+    """
+    Returns the tokens of a buffer which aren't skipped, end of data tokens included
+    """
+    result = TokenBuffer(buffer.keys, buffer.source, buffer.positions)
+
+    for keyId, start, end, reach in zip(
+        buffer.ids, buffer.starts, buffer.ends, buffer.reaches
+    ):
+        if keyId == 0 or not skipper(
+            Token(
+                buffer.keys[keyId],
+                None,
+                None,
+                None,
+                start,
+                end,
+                buffer.source,
+                buffer.positions,
+            )
+        ):
+            result.ids.append(keyId)
+            result.starts.append(start)
+            result.ends.append(end)
+            result.reaches.append(reach)
+
+    return result
+
+
+class ChunkTokenizer:
+    """
+    What tokenizeSource needs of a tokenizer, rebuilt by the worker processes of
+    Tokenizer.tokenizeParallel from the arrays of its table, see initChunkWorker.
+    Accelerated states are detected on first use
+    """
+
+    def __init__(
+        self,
+        table: TokenizerTable,
+        keys: list,
+        reclassified: list[dict[str, int]],
+        discarded: set[int],
+        skipper: Callable[[Token], bool] = keepAll,
+        accelerations: Accelerations = None,
+    ):
+        self.table: TokenizerTable = table
+        self.keys: list = keys
+        self.reclassified: list[dict[str, int]] = reclassified
+        self.discarded: set[int] = discarded
+        self.skipper: Callable[[Token], bool] = skipper
+        self.accelerations: Accelerations = accelerations
+
+    def accelerate(self) -> Accelerations:
+        if self.accelerations is None:
+            self.accelerations = Accelerations.of(self.table.rows(), self.table)
+
+        return self.accelerations
+
+
+# Tokenizer of the worker processes of Tokenizer.tokenizeParallel
+chunkTokenizer: ChunkTokenizer = None
+
+
+def initChunkWorker(
+    numClasses: int,
+    limit: int,
+    arrays: list[array],
+    keys: list,
+    reclassified: list[dict[str, int]],
+    discarded: set[int],
+    skipper: Callable[[Token], bool],
+):
+    global chunkTokenizer
+    chunkTokenizer = ChunkTokenizer(
+        TokenizerTable(numClasses, limit, *arrays),
+        keys,
+        reclassified,
+        discarded,
+        skipper,
+    )
+
+
+def tokenizeChunk(
+    text: str, start: int, last: bool
+) -> tuple[array, array, array, array, bool]:
+    """
+    Tokenizes a chunk of text as if a token started at its first character,
+    keeping the tokens whose reading stopped before its end
+    """
+    buffer = TokenBuffer(chunkTokenizer.keys, text, LineIndex(text))
+    complete = last
+
+    try:
+        tokenizeSource(chunkTokenizer, text, None, 0, buffer)
+    except Exception:
+        complete = False
+
+    kept = len(buffer) if complete else bisect_right(buffer.reaches, len(text))
+
+    return (
+        buffer.ids[:kept],
+        array("q", map(start.__add__, buffer.starts[:kept])),
+        array("q", map(start.__add__, buffer.ends[:kept])),
+        array("q", map(start.__add__, buffer.reaches[:kept])),
+        complete,
+    )
@@ -0,0 +1,164 @@
+from io import StringIO
+from typing import Callable
+
+from gammaparsing4py.tokenizer.regex import RegexRange
+from gammaparsing4py.tokenizer.table import FailureMemo, TokenizerTable
+
+# Past this number of comparisons, a state falls back to the transition table
+MAX_INLINED_TESTS = 8
+
+
+def _stateTests(row: list[tuple[RegexRange, int]]) -> list[tuple[list[str], int]]:
+    grouped: dict[int, list[RegexRange]] = {}
+    for key, target in sorted(row, key=lambda item: item[0].start):
+        grouped.setdefault(target, []).append(key)
+
+    result: list[tuple[list[str], int]] = []
+    for target, keys in grouped.items():
+        singles = "".join(chr(key.start) for key in keys if key.start == key.end)
+        tests = [
+            "{} <= c <= {}".format(repr(chr(key.start)), repr(chr(key.end)))
+            for key in keys
+            if key.start != key.end
+        ]
+
+        if len(singles) == 1:
+            tests.insert(0, "c == {}".format(repr(singles)))
+        elif len(singles) > 1:
+            tests.insert(0, "c in {}".format(repr(singles)))
+
+        result.append((tests, target))
+
+    return result
+
+
+def _writeState(
+    buffer: StringIO,
+    state: int,
+    row: list[tuple[RegexRange, int]],
+    table: TokenizerTable,
+    guarded: set[int],
+    indent: str,
+):
+    tests = _stateTests(row)
+
+    if table.stops[state] or len(tests) == 0:
+        buffer.write("{}break\n".format(indent))
+        return
+
+    if table.accepts[state] >= 0:
+        buffer.write("{0}last = {1}\n{0}lastEnd = position\n".format(indent, state))
+    elif state in guarded:
+        buffer.write(
+            "{0}if position < failures.limit and (\n"
+            "{0}    position * {1} + {2} in failures.pairs\n"
+            "{0}):\n"
+            "{0}    break\n".format(indent, table.numStates, state)
+        )
+
+    if sum(len(pieces) for pieces, _ in tests) > MAX_INLINED_TESTS:
+        buffer.write(
+            "{0}state = transitions[{1} + classOf(ord(c))]\n"
+            "{0}if state < 0:\n"
+            "{0}    state = {2}\n"
+            "{0}    break\n".format(indent, state * table.numClasses, state)
+        )
+        return
+
+    keyword = "if"
+    for pieces, target in tests:
+        buffer.write(
+            "{0}{1} {2}:\n{0}    state = {3}\n".format(
+                indent, keyword, " or ".join(pieces), target
+            )
+        )
+        keyword = "elif"
+    buffer.write("{0}else:\n{0}    break\n".format(indent))
+
+
+def _writeDispatch(
+    buffer: StringIO,
+    low: int,
+    high: int,
+    rows: list[list[tuple[RegexRange, int]]],
+    table: TokenizerTable,
+    guarded: set[int],
+    indent: str,
+):
+    if low == high:
+        _writeState(buffer, low, rows[low], table, guarded, indent)
+        return
+
+    middle = (low + high + 1) // 2
+    buffer.write("{}if state < {}:\n".format(indent, middle))
+    _writeDispatch(buffer, low, middle - 1, rows, table, guarded, indent + "    ")
+    buffer.write("{}else:\n".format(indent))
+    _writeDispatch(buffer, middle, high, rows, table, guarded, indent + "    ")
+
+
+def _guardedStates(
+    rows: list[list[tuple[RegexRange, int]]], table: TokenizerTable
+) -> set[int]:
+    """
+    Non-accepting states reachable from an accepting state, the only ones which can
+    be met after the last accepting state and therefore be memoized as failures
+    """
+    reached: set[int] = set()
+    stack = [
+        target
+        for state, row in enumerate(rows)
+        if table.accepts[state] >= 0
+        for _, target in row
+    ]
+
+    while stack:
+        state = stack.pop()
+        if state in reached:
+            continue
+        reached.add(state)
+        stack.extend(target for _, target in rows[state])
+
+    return {state for state in reached if table.accepts[state] < 0}
+
+
+def generateSource(
+    rows: list[list[tuple[RegexRange, int]]], table: TokenizerTable
+) -> str:
+    """
+    Generates the source of a function match(text, position, length, failures),
+    running the automaton over text from the given position and returning the id of
+    the key accepted by the last accepting state met (-1 if none) and its position,
+    failures being the FailureMemo of the scanned text. Each state is a block of
+    inlined comparisons, selected by a binary search over state ids
+    """
+    guarded = _guardedStates(rows, table)
+
+    buffer = StringIO()
+    buffer.write("def match(text, position, length, failures):\n")
+    buffer.write("    state = 0\n")
+    buffer.write("    last = -1\n")
+    buffer.write("    lastEnd = position\n")
+    buffer.write("    while position < length:\n")
+    buffer.write("        c = text[position]\n")
+    _writeDispatch(buffer, 0, len(rows) - 1, rows, table, guarded, "        ")
+    buffer.write("        position += 1\n")
+    buffer.write("    accept = accepts[state]\n")
+    buffer.write("    if accept >= 0 or last < 0:\n")
+    buffer.write("        return accept, position\n")
+    buffer.write("    failures.record(last, lastEnd, text[lastEnd:position])\n")
+    buffer.write("    return accepts[last], lastEnd\n")
+
+    return buffer.getvalue()
+
+
+def compileMatcher(
+    rows: list[list[tuple[RegexRange, int]]], table: TokenizerTable
+) -> Callable[[str, int, int, FailureMemo], tuple[int, int]]:
+    namespace = {
+        "transitions": table.transitions,
+        "classOf": table.classOf,
+        "accepts": table.accepts,
+    }
+    exec(compile(generateSource(rows, table), "<tokenizer>", "exec"), namespace)
+
+    return namespace["match"]
@@ -0,0 +1,94 @@
+"""Glushkov analysis of regexes, used to build position automata"""
+
+from gammaparsing4py.tokenizer.regex import (
+    Regex,
+    RegexChoice,
+    RegexClass,
+    RegexQuantified,
+    RegexRange,
+    RegexSequence,
+    getRegexChildren,
+)
+from gammaparsing4py.utils import unfoldPostfix
+
+EMPTY: frozenset[int] = frozenset()
+
+
+class PositionSets:
+
+    def __init__(self):
+        # Ranges of the character class of each position
+        self.ranges: list[list[RegexRange]] = []
+
+        self.nullable: bool = False
+        self.first: frozenset[int] = EMPTY
+        self.last: frozenset[int] = EMPTY
+
+        # Positions which may follow each position, as a list of sets which are shared
+        # between positions instead of being merged
+        self.follow: list[list[frozenset[int]]] = []
+
+    def of(pattern: Regex):
+        result = PositionSets()
+
+        # Nullability, first and last positions of each fragment
+        stack: list[tuple[bool, frozenset[int], frozenset[int]]] = []
+
+        for fragment in reversed(unfoldPostfix(pattern, getRegexChildren)):
+
+            if isinstance(fragment, RegexClass):
+                position = len(result.ranges)
+                result.ranges.append(fragment.ranges)
+                result.follow.append([])
+
+                stack.append((False, frozenset([position]), frozenset([position])))
+                continue
+
+            if isinstance(fragment, RegexQuantified):
+                nullable, first, last = stack.pop()
+
+                if fragment.quantifier != RegexQuantified.INTERROGATION_MARK:
+                    result._addFollow(last, first)
+
+                if fragment.quantifier != RegexQuantified.PLUS:
+                    nullable = True
+
+                stack.append((nullable, first, last))
+                continue
+
+            if isinstance(fragment, RegexSequence):
+                nullable, first, last = True, EMPTY, EMPTY
+
+                for _ in fragment.getChildren():
+                    itemNullable, itemFirst, itemLast = stack.pop()
+                    result._addFollow(last, itemFirst)
+
+                    if nullable:
+                        first = first | itemFirst
+                    last = last | itemLast if itemNullable else itemLast
+                    nullable = nullable and itemNullable
+
+                stack.append((nullable, first, last))
+                continue
+
+            if isinstance(fragment, RegexChoice):
+                nullable, first, last = False, EMPTY, EMPTY
+
+                for _ in fragment.getChildren():
+                    itemNullable, itemFirst, itemLast = stack.pop()
+
+                    nullable = nullable or itemNullable
+                    first = first | itemFirst
+                    last = last | itemLast
+
+                stack.append((nullable, first, last))
+
+        result.nullable, result.first, result.last = stack.pop()
+        return result
+
+    def _addFollow(self, positions: frozenset[int], following: frozenset[int]):
+        if len(following) == 0:
+            return
+
+        for position in positions:
+            self.follow[position].append(following)
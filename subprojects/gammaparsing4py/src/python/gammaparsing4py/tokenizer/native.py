@@ -0,0 +1,291 @@
+"""Tokenization backend delegating the scanning to Python's re engine"""
+
+import re
+from bisect import bisect_right
+from collections import deque
+from typing import Generic, TypeVar
+
+from gammaparsing4py.tokenizer.regex import RegexRange
+from gammaparsing4py.tokenizer.table import FailureMemo, TokenizerTable, computeClasses
+
+T = TypeVar("T")
+
+# Generated sources longer than this are considered untranslatable
+MAX_SOURCE_LENGTH = 1 << 16
+
+
+def _escape(code: int) -> str:
+    if code < 0x100:
+        return "\\x{:02x}".format(code)
+    if code < 0x10000:
+        return "\\u{:04x}".format(code)
+    return "\\U{:08x}".format(code)
+
+
+def classSource(ranges: list[RegexRange]) -> str:
+    if len(ranges) == 1 and ranges[0].start == ranges[0].end:
+        return _escape(ranges[0].start)
+
+    return "[{}]".format(
+        "".join(
+            (
+                _escape(key.start)
+                if key.start == key.end
+                else "{}-{}".format(_escape(key.start), _escape(key.end))
+            )
+            for key in ranges
+        )
+    )
+
+
+def _groupedTransitions(node) -> dict[int, list[RegexRange]]:
+    grouped: dict[int, list[RegexRange]] = {}
+    for key, target in sorted(node.getTransitions(), key=lambda item: item[0].start):
+        grouped.setdefault(target, []).append(key)
+    return grouped
+
+
+def greedySource(nodes: list) -> str:
+    """
+    Translates a minimal automaton whose only cycles are self-loops, so that greedy
+    matching returns the longest match. Returns None otherwise
+    """
+    order: list[int] = []
+    visited: dict[int, bool] = {}
+    stack: deque[tuple[int, bool]] = deque([(0, False)])
+
+    # Topological ordering, rejecting cycles which are not self-loops
+    while stack:
+        current, processed = stack.pop()
+
+        if processed:
+            visited[current] = True
+            order.append(current)
+            continue
+
+        if current in visited:
+            continue
+
+        visited[current] = False
+        stack.append((current, True))
+
+        for target in _groupedTransitions(nodes[current]):
+            if target == current:
+                continue
+            if visited.get(target) is False:
+                return None
+            if target not in visited:
+                stack.append((target, False))
+
+    sources: dict[int, str] = {}
+    for current in order:
+        grouped = _groupedTransitions(nodes[current])
+
+        loop = ""
+        if current in grouped:
+            loop = classSource(grouped.pop(current)) + "*"
+
+        alternatives = [
+            classSource(ranges) + sources[target] for target, ranges in grouped.items()
+        ]
+
+        if len(alternatives) == 0:
+            sources[current] = loop
+        elif nodes[current].entry is not None:
+            sources[current] = "{}(?:{})?".format(loop, "|".join(alternatives))
+        elif len(alternatives) == 1:
+            sources[current] = loop + alternatives[0]
+        else:
+            sources[current] = "{}(?:{})".format(loop, "|".join(alternatives))
+
+        if len(sources[current]) > MAX_SOURCE_LENGTH:
+            return None
+
+    return sources[0]
+
+
+def shortestSource(nodes: list) -> str:
+    """
+    Translates the automaton, with the transitions leaving accepting states removed,
+    by state elimination. Returns None if the result is too large
+    """
+    START = -1
+    END = -2
+
+    edges: dict[tuple[int, int], str] = {(START, 0): ""}
+    for node in nodes:
+        if node.entry is not None:
+            edges[(node.id, END)] = ""
+            continue
+
+        for target, ranges in _groupedTransitions(node).items():
+            edges[(node.id, target)] = classSource(ranges)
+
+    for node in nodes:
+        loop = edges.pop((node.id, node.id), None)
+        star = "" if loop is None else "(?:{})*".format(loop)
+
+        incoming = [
+            (key[0], value) for key, value in edges.items() if key[1] == node.id
+        ]
+        outgoing = [
+            (key[1], value) for key, value in edges.items() if key[0] == node.id
+        ]
+
+        for key in list(edges.keys()):
+            if node.id in key:
+                del edges[key]
+
+        for source, before in incoming:
+            for target, after in outgoing:
+                path = before + star + after
+                if (source, target) in edges:
+                    path = "(?:{}|{})".format(edges[(source, target)], path)
+
+                if len(path) > MAX_SOURCE_LENGTH:
+                    return None
+                edges[(source, target)] = path
+
+    return edges.get((START, END))
+
+
+class NativeScanner(Generic[T]):
+    """
+    Scanner dispatching on the first character of each token to a compiled
+    expression, either the one of the single pattern which can start with it, or a
+    master expression capturing the match of every candidate pattern in lookaheads
+    """
+
+    def __init__(
+        self,
+        points: list[int],
+        classes: list[int],
+        dispatch: list[tuple[re.Pattern, list[int], list[bool]]],
+        table: TokenizerTable,
+    ):
+        self.points: list[int] = points
+        self.classes: list[int] = classes
+        self.dispatch: list[tuple[re.Pattern, list[int], list[bool]]] = dispatch
+        self.table: TokenizerTable = table
+
+    def match(
+        self, text: str, position: int, length: int, failures: FailureMemo = None
+    ) -> tuple[int, int]:
+        """
+        The re engine backs up by itself, failures are not used
+        """
+        candidates = self.dispatch[
+            self.classes[bisect_right(self.points, ord(text[position])) - 1]
+        ]
+        if candidates is None:
+            return -1, position
+
+        regex, keyIds, reluctants = candidates
+        found = regex.match(text, position)
+
+        if len(keyIds) == 1:
+            if found is None:
+                return -1, position
+            return keyIds[0], found.end()
+
+        # Longest match, unless a reluctant pattern matched
+        ends = [found.end(group) for group in range(1, len(keyIds) + 1)]
+        target = max(ends)
+        reluctant = False
+        for index, end in enumerate(ends):
+            if reluctants[index] and end >= 0 and (not reluctant or end < target):
+                target = end
+                reluctant = True
+
+        if target < 0:
+            return -1, position
+
+        keyId = -1
+        for index, end in enumerate(ends):
+            if end != target or (reluctant and not reluctants[index]):
+                continue
+
+            if keyId < 0:
+                keyId = keyIds[index]
+            elif keyId != keyIds[index]:
+                return self._resolve(text, position, target), target
+
+        return keyId, target
+
+    def _resolve(self, text: str, position: int, end: int) -> int:
+        """
+        Several patterns matched the lexeme, the automaton's entry tells which wins
+        """
+        state = 0
+        for index in range(position, end):
+            state = self.table.next(state, ord(text[index]))
+
+        return self.table.accepts[state]
+
+    def of(
+        patterns: list[tuple[list, T, bool, set[T]]],
+        keyIds: dict[T, int],
+        table: TokenizerTable,
+    ):
+        """
+        Builds a scanner from the minimal automaton of each pattern along with its
+        value, reluctancy and above set. Returns None if the patterns can't be
+        translated faithfully
+        """
+        # Patterns whose key is shadowed everywhere never win
+        patterns = [pattern for pattern in patterns if pattern[1] in keyIds]
+
+        sources: list[str] = []
+
+        for nodes, value, reluctant, above in patterns:
+            # Patterns matching the empty string
+            if nodes[0].entry is not None:
+                return None
+
+            # Reluctant patterns must never be overriden by another pattern
+            if reluctant and any(
+                value in otherAbove and otherValue != value
+                for _, otherValue, _, otherAbove in patterns
+            ):
+                return None
+
+            source = shortestSource(nodes) if reluctant else greedySource(nodes)
+            if source is None:
+                return None
+            sources.append(source)
+
+        # Dispatching according to the first character
+        rows = [
+            [(key, index) for key, _ in nodes[0].getTransitions()]
+            for index, (nodes, _, _, _) in enumerate(patterns)
+        ]
+        points, classes = computeClasses(rows)
+
+        candidates: dict[int, set[int]] = {}
+        for row in rows:
+            for key, index in row:
+                for point in range(
+                    bisect_right(points, key.start) - 1, bisect_right(points, key.end)
+                ):
+                    candidates.setdefault(classes[point], set()).add(index)
+
+        dispatch: list[tuple[re.Pattern, list[int], list[bool]]] = [None] * (
+            max(classes) + 1
+        )
+        for classId, indexes in candidates.items():
+            indexes = sorted(indexes)
+
+            if len(indexes) == 1:
+                regex = re.compile(sources[indexes[0]])
+            else:
+                regex = re.compile(
+                    "".join("(?=({})|)".format(sources[index]) for index in indexes)
+                )
+
+            dispatch[classId] = (
+                regex,
+                [keyIds[patterns[index][1]] for index in indexes],
+                [patterns[index][2] for index in indexes],
+            )
+
+        return NativeScanner(points, classes, dispatch, table)
@@ -8,6 +8,9 @@ from gammaparsing4py.core.charflow import CharFlow
 
 T = TypeVar("T")
 
+# Highest Unicode code point, bounding the ranges of inverted classes and '.'
+MAX_CODE_POINT = 0x10FFFF
+
 ## Regex structure
 
 
@@ -201,7 +204,9 @@ class RegexRange:
         return RegexRange.disjointList(list(itertools.chain.from_iterable(lists)))
 
     def invertList(
-        target: list[RegexRange], lowerLimit: int = 0, higherLimit: int = 0xFFFF
+        target: list[RegexRange],
+        lowerLimit: int = 0,
+        higherLimit: int = MAX_CODE_POINT,
     ):
         result = []
         lower = lowerLimit
@@ -415,7 +420,7 @@ def getHexValue(target: int):
 
 def _readChar(flow: CharFlow, protected: bool = False):
     if flow.check(ord(".")):
-        return [RegexRange(0, 0xFFFF)]
+        return [RegexRange(0, MAX_CODE_POINT)]
     if flow.check(ord("\\")) or protected:
         if flow.check(ord("p")):
             posixClass = _readPosixIdentifier(flow)
@@ -0,0 +1,271 @@
+"""Maximal-munch scanning loop shared by every way of tokenizing"""
+
+from typing import Callable, Iterator, Sequence
+
+from gammaparsing4py.core.charflow import BufferedCharFlow, CharFlow
+from gammaparsing4py.core.positions import LineIndex
+from gammaparsing4py.tokenizer.accelerate import Accelerations
+from gammaparsing4py.tokenizer.table import FailureMemo, TokenizerTable
+
+
+def unparsable(text: str, start: int, positions: LineIndex) -> Exception:
+    line, column = positions.position(start)
+    return Exception(
+        "Unable to parse '\x1b[1;31m{}\x1b[0m' at line {}, column {}".format(
+            text, line, column
+        )
+    )
+
+
+def longestMatches(
+    table: TokenizerTable,
+    classes: Sequence[int],
+    position: int,
+    failures: FailureMemo,
+    accelerations: Accelerations = None,
+    source=None,
+    base: int = 0,
+    more: Callable[[int], tuple] = None,
+) -> Iterator[tuple[int, int, int]]:
+    """
+    Yields the key id (-1 if none), end and reach of each longest match from
+    position. Given more, classes and source are a block starting at base, more
+    returning the next one, or None while it is awaited
+    """
+    transitions = table.transitions
+    numClasses = table.numClasses
+    accepts = table.accepts
+    stops = table.stops
+    numStates = table.numStates
+
+    if accelerations is not None:
+        accelerated = accelerations.flags
+        loops, chains = accelerations.select(source)
+    else:
+        accelerated = bytes(numStates)
+
+    pairs = failures.pairs
+
+    # Offsets are relative to the current block, the blocks met since the start of
+    # the current match being kept to back up
+    position -= base
+    passed: list[tuple] = []
+
+    while True:
+        flushes = table.flushes
+        if failures.generation != flushes:
+            failures.clear(flushes)
+        failureLimit = failures.limit - base
+
+        state = 0
+        index = position
+
+        # Last accepting state met, as the states of lazy tables don't survive
+        # flushes its key is kept as well
+        lastState = 0
+        lastAccept = accepts[0]
+        lastEnd = position
+
+        while not stops[state]:
+            if index < failureLimit and (index + base) * numStates + state in pairs:
+                break
+
+            try:
+                classId = classes[index]
+            except IndexError:
+                if more is None:
+                    break
+
+                following = more(base + len(classes))
+                while following is None:
+                    # Waiting for more data, see AsyncTokenizerIterator
+                    yield None
+                    following = more(base + len(classes))
+
+                block, data = following
+                if len(block) == 0:
+                    break
+
+                # Blocks preceding the one where the match started are dropped
+                if position >= 0:
+                    passed.clear()
+                passed.append((classes, source, base))
+
+                shift = len(classes)
+                classes = block
+                source = data
+                base += shift
+                position -= shift
+                index -= shift
+                lastEnd -= shift
+                failureLimit -= shift
+                continue
+
+            nextState = transitions[state * numClasses + classId]
+
+            if nextState < 0:
+                if nextState == -1:
+                    break
+
+                nextState = table.expand(state, classId)
+                if table.flushes != flushes:
+                    failureLimit = 0
+                if nextState < 0:
+                    break
+
+            state = nextState
+            index += 1
+
+            if accepts[state] >= 0:
+                lastState = state
+                lastAccept = accepts[state]
+                lastEnd = index
+
+            # Following loops and chains at once, unless recorded failures may be
+            # skipped
+            if accelerated[state] and index >= failureLimit:
+                loop = loops[state]
+                if loop is not None:
+                    index = loop(source, index).end()
+                else:
+                    chain = chains[state]
+                    if chain is None:
+                        continue
+                    match = chain[0](source, index)
+                    if match is None:
+                        continue
+                    index = match.end()
+                    state = chain[1]
+
+                if accepts[state] >= 0:
+                    lastState = state
+                    lastAccept = accepts[state]
+                    lastEnd = index
+
+        reached = base + index + 1
+        accept = accepts[state]
+
+        # Backing up to the last accepting state, pairs met over several blocks
+        # being left out
+        if accept < 0 and lastAccept >= 0:
+            if table.flushes == flushes and lastEnd >= 0:
+                failures.recordClasses(
+                    lastState, base + lastEnd, classes[lastEnd:index]
+                )
+
+            while lastEnd < 0:
+                classes, source, previous = passed.pop()
+                lastEnd += base - previous
+                base = previous
+
+            accept = lastAccept
+            index = lastEnd
+
+        yield accept, base + index, reached
+        position = index
+
+
+class FlowClasses:
+    """
+    Class ids of the characters of a flow, read one at a time for longestMatches,
+    or one block at a time for buffered flows given blocks
+    """
+
+    def __init__(
+        self,
+        flow: CharFlow,
+        table: TokenizerTable,
+        failures: FailureMemo,
+        accelerations: Accelerations = None,
+        blocks: bool = False,
+    ):
+        self.flow: CharFlow = flow
+        self.table: TokenizerTable = table
+        self.failures: FailureMemo = failures
+        self.accelerations: Accelerations = accelerations
+        self.blocks: bool = blocks and isinstance(flow, BufferedCharFlow)
+        self.offset: int = flow.offset
+
+        # Methods of the flow and class of each character, looked up inline
+        self.step: Callable[[], None] = flow._step
+        self.peek: Callable[[], int] = flow.peek
+        self.translation: str = table.translation()
+
+        # Class ids of the buffer of the flow
+        self.buffer: str = None
+        self.ids: Sequence[int] = None
+
+        self.matches: Iterator[tuple[int, int, int]] = self.scan()
+
+    def scan(self) -> Iterator[tuple[int, int, int]]:
+        """
+        Returns the matches scanned from the current offset of the flow, in place
+        unless characters were pushed back onto the flow
+        """
+        flow = self.flow
+
+        if not self.blocks or flow.stack:
+            return longestMatches(self.table, self, self.offset, self.failures)
+
+        if flow.buffer is not self.buffer:
+            self.buffer = flow.buffer
+            self.ids = self.table.classIds(flow.buffer)
+
+        return longestMatches(
+            self.table,
+            self.ids,
+            self.offset,
+            self.failures,
+            self.accelerations,
+            flow.buffer,
+            flow.origin,
+            self.more,
+        )
+
+    def more(self, offset: int) -> tuple:
+        """
+        Returns the class ids and the data of the block read from the given offset,
+        None if the flow has to receive it first
+        """
+        block = self.flow.block(offset)
+        if block is None:
+            return None
+        return self.table.classIds(block), block
+
+    def sync(self):
+        """
+        Scans from the current offset of the flow again if it was moved since the
+        last match
+        """
+        if self.flow.offset != self.offset:
+            self.offset = self.flow.offset
+            self.matches = self.scan()
+
+    def seek(self, offset: int):
+        """
+        Moves the flow to the given offset, either the one following the current
+        one or an offset located after its mark
+        """
+        if offset == self.offset + 1:
+            self.flow.next()
+        elif offset != self.offset:
+            self.flow.rewind(offset)
+        self.offset = offset
+
+    def __getitem__(self, index: int) -> int:
+        # The current character was peeked already
+        if index == self.offset + 1:
+            self.step()
+            self.offset = index
+        elif index != self.offset:
+            text = self.flow.slice(index.start, index.stop)
+            return [
+                self.table.classOf(code)
+                for code in (map(ord, text) if isinstance(text, str) else text)
+            ]
+
+        code = self.peek()
+        if code < 0:
+            raise IndexError(index)
+
+        return ord(self.translation[code])
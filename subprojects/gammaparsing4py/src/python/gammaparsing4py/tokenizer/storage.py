@@ -0,0 +1,79 @@
+"""Versioned binary format of built tokenizers"""
+
+import json
+import struct
+import sys
+from array import array
+
+MAGIC = b"GPTK"
+VERSION = 1
+
+# Magic number, version and header length
+PREAMBLE = struct.Struct("<4sII")
+
+# Type code, item size and length of an array
+ARRAY_PREAMBLE = struct.Struct("<cBQ")
+
+
+def writeTokenizerFile(path: str, header: dict, arrays: list[array]):
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    with open(path, "wb") as stream:
+        stream.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        stream.write(encoded)
+
+        for values in arrays:
+            stream.write(
+                ARRAY_PREAMBLE.pack(
+                    values.typecode.encode("ascii"), values.itemsize, len(values)
+                )
+            )
+            # Items are stored in little-endian byte order
+            if sys.byteorder == "big":
+                values = array(values.typecode, values)
+                values.byteswap()
+            stream.write(values.tobytes())
+
+
+def readTokenizerFile(path: str) -> tuple[dict, list[array]]:
+    with open(path, "rb") as stream:
+        data = memoryview(stream.read())
+
+    if len(data) < PREAMBLE.size:
+        raise Exception("'{}' is not a tokenizer file".format(path))
+
+    magic, version, headerLength = PREAMBLE.unpack_from(data)
+    if magic != MAGIC:
+        raise Exception("'{}' is not a tokenizer file".format(path))
+    if version != VERSION:
+        raise Exception(
+            "Tokenizer file '{}' has version {}, expected {}".format(
+                path, version, VERSION
+            )
+        )
+
+    offset = PREAMBLE.size
+    header = json.loads(bytes(data[offset : offset + headerLength]))
+    offset += headerLength
+
+    arrays: list[array] = []
+    while offset < len(data):
+        typecode, itemsize, length = ARRAY_PREAMBLE.unpack_from(data, offset)
+        offset += ARRAY_PREAMBLE.size
+
+        values = array(typecode.decode("ascii"))
+        if values.itemsize != itemsize:
+            raise Exception(
+                "Tokenizer file '{}' has arrays of {} bytes items, expected {}".format(
+                    path, itemsize, values.itemsize
+                )
+            )
+
+        values.frombytes(data[offset : offset + itemsize * length])
+        if sys.byteorder == "big":
+            values.byteswap()
+
+        arrays.append(values)
+        offset += itemsize * length
+
+    return header, arrays
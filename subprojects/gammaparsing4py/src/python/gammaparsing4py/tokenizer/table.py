@@ -0,0 +1,420 @@
+from array import array
+from bisect import bisect_left, bisect_right
+import sys
+from typing import Iterable, Union
+
+from gammaparsing4py.tokenizer.regex import MAX_CODE_POINT, RegexRange
+
+PAGE_BITS = 8
+PAGE_SIZE = 1 << PAGE_BITS
+PAGE_MASK = PAGE_SIZE - 1
+
+# Code points below this limit are mapped by the page table
+CODE_POINT_LIMIT = MAX_CODE_POINT + 1
+
+# Encoding of strings as arrays of native 32 bits code points
+CODE_POINTS_ENCODING = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
+# Size of the blocks in which bytes-like data other than bytes is translated
+TRANSLATION_BLOCK_SIZE = 1 << 20
+
+
+def computeClasses(
+    rows: list[list[tuple[RegexRange, int]]]
+) -> tuple[list[int], list[int]]:
+    """
+    Partitions the code point space into equivalence classes: two characters share a
+    class if every row sends them to the same target. The space is split into
+    intervals starting at the returned points, the class of each interval is
+    returned alongside. Class 0 gathers the characters without any transition
+    """
+    boundaries: set[int] = {0}
+    for row in rows:
+        for key, _ in row:
+            boundaries.add(key.start)
+            boundaries.add(key.end + 1)
+
+    points: list[int] = sorted(boundaries)
+    classes: list[int] = [0] * len(points)
+    live: list[bool] = [False] * len(points)
+
+    for row in rows:
+        targets: list[int] = [-1] * len(points)
+
+        for key, target in row:
+            for index in range(
+                bisect_left(points, key.start), bisect_left(points, key.end + 1)
+            ):
+                # Ranges of a same row may overlap in non-deterministic automata
+                previous = targets[index]
+                if previous == -1 or previous == target:
+                    targets[index] = target
+                else:
+                    targets[index] = previous, target
+                live[index] = True
+
+        remap: dict[tuple[int, int], int] = {}
+        classes = [
+            remap.setdefault(signature, len(remap))
+            for signature in zip(classes, targets)
+        ]
+
+    # Renumbering, keeping class 0 for the characters without any transition
+    renumbering: dict[int, int] = {}
+    for value, isLive in zip(classes, live):
+        if not isLive:
+            renumbering[value] = 0
+
+    nextClass = 1
+    for value in classes:
+        if value not in renumbering:
+            renumbering[value] = nextClass
+            nextClass += 1
+
+    return points, [renumbering[value] for value in classes]
+
+
+def buildClassMap(
+    points: list[int], intervalClasses: list[int], limit: int
+) -> tuple[array, array, array, array]:
+    """
+    Builds the page table of the classes of the code points below limit, and the
+    sorted ranges of the classes above, from the intervals given by computeClasses.
+    Identical pages are stored once, pages within a single interval being built
+    without enumerating their code points
+    """
+    pageIndex = array("i")
+    pageData = array("i")
+    pageOffsets: dict[bytes, int] = {}
+
+    # Offsets of the full pages made of a single class
+    uniformOffsets: dict[int, int] = {}
+
+    index = 0
+    for start in range(0, limit, PAGE_SIZE):
+        end = min(start + PAGE_SIZE, limit)
+        while index + 1 < len(points) and points[index + 1] <= start:
+            index += 1
+
+        uniform = index + 1 >= len(points) or points[index + 1] >= end
+        full = uniform and end - start == PAGE_SIZE
+        if full and intervalClasses[index] in uniformOffsets:
+            pageIndex.append(uniformOffsets[intervalClasses[index]])
+            continue
+
+        if uniform:
+            page = array("i", [intervalClasses[index]]) * (end - start)
+        else:
+            page = array("i")
+            current = index
+            while current < len(points) and points[current] < end:
+                upper = points[current + 1] if current + 1 < len(points) else end
+                page.extend(
+                    array("i", [intervalClasses[current]])
+                    * (min(upper, end) - max(points[current], start))
+                )
+                current += 1
+
+        signature = page.tobytes()
+        if signature not in pageOffsets:
+            pageOffsets[signature] = len(pageData)
+            pageData.extend(page)
+
+        pageIndex.append(pageOffsets[signature])
+        if full:
+            uniformOffsets[intervalClasses[index]] = pageOffsets[signature]
+
+    highStarts = array("i", [limit])
+    highClasses = array("i", [intervalClasses[bisect_right(points, limit) - 1]])
+    for index, point in enumerate(points):
+        if point > limit:
+            highStarts.append(point)
+            highClasses.append(intervalClasses[index])
+
+    return pageIndex, pageData, highStarts, highClasses
+
+
+class TokenizerTable:
+    """
+    Flat representation of a tokenizer automaton. Code points are mapped to
+    equivalence classes through a two-level page table, transitions are stored in a
+    single array indexed by state * numClasses + class, -1 denoting dead transitions
+    """
+
+    def __init__(
+        self,
+        numClasses: int,
+        limit: int,
+        pageIndex: array,
+        pageData: array,
+        highStarts: array,
+        highClasses: array,
+        transitions: array,
+        accepts: array,
+        stops: array,
+        discards: array,
+        points: array = None,
+        intervalClasses: array = None,
+    ):
+        self.numClasses: int = numClasses
+        self.numStates: int = len(accepts)
+
+        # Class map: pages for code points below limit, sorted ranges above
+        self.limit: int = limit
+        self.pageIndex: array[int] = pageIndex
+        self.pageData: array[int] = pageData
+        self.highStarts: array[int] = highStarts
+        self.highClasses: array[int] = highClasses
+
+        self.transitions: array[int] = transitions
+
+        # Key id accepted by each state (-1 if none), whether reading must stop, and
+        # whether the accepted lexeme must be discarded
+        self.accepts: array[int] = accepts
+        self.stops: array[int] = stops
+        self.discards: array[int] = discards
+
+        # Intervals of code points given by computeClasses, used to rebuild the
+        # transitions as ranges
+        self.points: array[int] = points
+        self.intervalClasses: array[int] = intervalClasses
+
+        # Number of times the states were renumbered, see LazyTable
+        self.flushes: int = 0
+
+        # String whose character of each code point stands for its class, built once
+        # by translation
+        self.translated: str = None
+
+    def arrays(self) -> list[array]:
+        """
+        Returns the arrays the table is made of, in the order of the constructor
+        """
+        return [
+            self.pageIndex,
+            self.pageData,
+            self.highStarts,
+            self.highClasses,
+            self.transitions,
+            self.accepts,
+            self.stops,
+            self.discards,
+            self.points,
+            self.intervalClasses,
+        ]
+
+    def classOf(self, code: int) -> int:
+        if code < self.limit:
+            return self.pageData[self.pageIndex[code >> PAGE_BITS] + (code & PAGE_MASK)]
+
+        return self.highClasses[bisect_right(self.highStarts, code) - 1]
+
+    def step(self, state: int, classId: int) -> int:
+        return self.transitions[state * self.numClasses + classId]
+
+    def next(self, state: int, code: int) -> int:
+        return self.step(state, self.classOf(code))
+
+    def translation(self) -> str:
+        """
+        Returns the table of str.translate mapping each character to the character
+        whose code point is its class id. It is built once from the class map
+        """
+        if self.translated is None:
+            pages: dict[int, str] = {}
+            parts: list[str] = []
+            for offset in self.pageIndex:
+                if offset not in pages:
+                    pages[offset] = "".join(
+                        map(chr, self.pageData[offset : offset + PAGE_SIZE])
+                    )
+                parts.append(pages[offset])
+
+            # The last page may be cut by the limit
+            parts = ["".join(parts)[: self.limit]]
+
+            ends = list(self.highStarts[1:]) + [CODE_POINT_LIMIT]
+            for start, end, classId in zip(self.highStarts, ends, self.highClasses):
+                parts.append(chr(classId) * (end - start))
+
+            self.translated = "".join(parts)
+
+        return self.translated
+
+    def classIds(self, data) -> Union[bytes, array]:
+        """
+        Returns the class id of each character of a string, or of each byte of
+        bytes-like data, as bytes if every id fits in a byte, as an array otherwise.
+        Characters are mapped at once by str.translate, bytes by bytes.translate
+        """
+        translation = self.translation()
+
+        if isinstance(data, str):
+            translated = data.translate(translation)
+        elif self.numClasses > 0x100:
+            translated = str(data, "latin-1").translate(translation)
+        else:
+            byteTranslation = translation[:0x100].encode("latin-1")
+            if isinstance(data, (bytes, bytearray)):
+                return data.translate(byteTranslation)
+
+            with memoryview(data) as view:
+                return b"".join(
+                    bytes(view[start : start + TRANSLATION_BLOCK_SIZE]).translate(
+                        byteTranslation
+                    )
+                    for start in range(0, len(view), TRANSLATION_BLOCK_SIZE)
+                )
+
+        if self.numClasses <= 0x100:
+            return translated.encode("latin-1")
+        return array("i", translated.encode(CODE_POINTS_ENCODING))
+
+    def rows(self) -> list[list[tuple[RegexRange, int]]]:
+        """
+        Returns the transitions of each state as ranges leading to state ids, rebuilt
+        from the class intervals
+        """
+        ends = list(self.points[1:]) + [MAX_CODE_POINT + 1]
+        intervals = [
+            (start, min(end, MAX_CODE_POINT + 1) - 1, classId)
+            for start, end, classId in zip(self.points, ends, self.intervalClasses)
+            if start <= MAX_CODE_POINT
+        ]
+
+        result: list[list[tuple[RegexRange, int]]] = []
+        for state in range(self.numStates):
+            row: list[tuple[RegexRange, int]] = []
+            base = state * self.numClasses
+
+            for start, end, classId in intervals:
+                target = self.transitions[base + classId]
+                if target < 0:
+                    continue
+
+                # Merging adjacent intervals leading to the same state
+                previous = row[-1] if len(row) > 0 else None
+                if (
+                    previous is not None
+                    and previous[1] == target
+                    and previous[0].end == start - 1
+                ):
+                    previous[0].end = end
+                else:
+                    row.append((RegexRange(start, end), target))
+
+            result.append(row)
+
+        return result
+
+    def of(
+        rows: list[list[tuple[RegexRange, int]]],
+        entries: list[tuple[int, bool]],
+        discarded: set[int] = set(),
+        limit: int = CODE_POINT_LIMIT,
+    ):
+        """
+        Builds the table from the transitions of each state, given as ranges leading
+        to state ids, the accepting entry of each state, given as a key id and a
+        reluctancy flag (or None), and the ids of the keys whose lexemes are discarded
+        """
+        points, intervalClasses = computeClasses(rows)
+        numClasses = max(intervalClasses) + 1
+
+        pageIndex, pageData, highStarts, highClasses = buildClassMap(
+            points, intervalClasses, limit
+        )
+
+        # Transitions
+        transitions = array("i", [-1]) * (len(rows) * numClasses)
+        for state, row in enumerate(rows):
+            for key, target in row:
+                for index in range(
+                    bisect_left(points, key.start), bisect_left(points, key.end + 1)
+                ):
+                    transitions[state * numClasses + intervalClasses[index]] = target
+
+        # Entries
+        accepts = array("i", [-1]) * len(entries)
+        stops = array("b", bytes(len(entries)))
+        discards = array("b", bytes(len(entries)))
+        for state, entry in enumerate(entries):
+            if entry is not None:
+                accepts[state] = entry[0]
+                stops[state] = entry[1]
+                discards[state] = entry[0] in discarded
+
+        return TokenizerTable(
+            numClasses,
+            limit,
+            pageIndex,
+            pageData,
+            highStarts,
+            highClasses,
+            transitions,
+            accepts,
+            stops,
+            discards,
+            array("i", points),
+            array("i", intervalClasses),
+        )
+
+
+class FailureMemo:
+    """
+    Memoization of the (state, offset) pairs from which no accepting state can be
+    reached, following Reps' "Maximal-munch" tokenization in linear time: when
+    scanning has to back up to the last accepting state, every pair met after it is
+    recorded, so that later scans starting from subsequent offsets stop as soon as
+    they meet one of them instead of scanning the same characters again
+    """
+
+    def __init__(self, table: TokenizerTable):
+        self.table: TokenizerTable = table
+
+        # Pairs are encoded as offset * numStates + state
+        self.pairs: set[int] = set()
+
+        # Every recorded offset is below limit
+        self.limit: int = 0
+
+        # Number of flushes of the table when the pairs were recorded, the states of
+        # lazy tables being renumbered by flushes
+        self.generation: int = 0
+
+    def clear(self, generation: int = 0):
+        self.pairs.clear()
+        self.limit = 0
+        self.generation = generation
+
+    def record(self, state: int, start: int, text: str):
+        """
+        Records the pairs met when reading text from the given state, the first
+        character of text being located at the offset start
+        """
+        self.recordClasses(
+            state,
+            start,
+            map(self.table.classOf, map(ord, text) if isinstance(text, str) else text),
+        )
+
+    def recordClasses(self, state: int, start: int, classes: Iterable[int]):
+        """
+        Records the pairs met when reading characters of the given class ids from
+        the given state, like record. Pairs are dropped if the table is flushed in
+        the process, see LazyTable
+        """
+        table = self.table
+        numStates = table.numStates
+
+        offset = start
+        for classId in classes:
+            state = table.step(state, classId)
+            offset += 1
+            self.pairs.add(offset * numStates + state)
+
+        if table.flushes != self.generation:
+            self.clear(table.flushes)
+            return
+
+        self.limit = max(self.limit, offset + 1)
@@ -1,10 +1,28 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+import codecs
 from collections import deque
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
 import itertools
-from typing import Callable, Iterator, Generic, TypeVar
-
-from gammaparsing4py.core.charflow import CharFlow
-from gammaparsing4py.core.token import Token
+from multiprocessing.context import BaseContext
+import pickle
+from typing import AsyncIterator, Callable, Iterable, Iterator, Generic, TypeVar
+
+from gammaparsing4py.core.charflow import AsyncCharFlow, CharFlow, mapFile
+from gammaparsing4py.core.positions import LineIndex
+from gammaparsing4py.core.token import Token, TokenBuffer, keepAll
+from gammaparsing4py.tokenizer.accelerate import Accelerations
+from gammaparsing4py.tokenizer.bulk import (
+    ChunkTokenizer,
+    initChunkWorker,
+    skipTokens,
+    tokenizeChunk,
+    tokenizeSource,
+)
+from gammaparsing4py.tokenizer.codegen import compileMatcher
+from gammaparsing4py.tokenizer.glushkov import PositionSets
+from gammaparsing4py.tokenizer.native import NativeScanner
 from gammaparsing4py.tokenizer.regex import (
     Regex,
     RegexChoice,
@@ -15,10 +33,30 @@ from gammaparsing4py.tokenizer.regex import (
     getRegexChildren,
     parseRegex,
 )
+from gammaparsing4py.tokenizer.table import (
+    CODE_POINT_LIMIT,
+    FailureMemo,
+    TokenizerTable,
+    buildClassMap,
+    computeClasses,
+)
+from gammaparsing4py.tokenizer.scanner import FlowClasses, unparsable
+from gammaparsing4py.tokenizer.storage import readTokenizerFile, writeTokenizerFile
+from gammaparsing4py.tokenizer.utf8 import utf8Sequences
+from gammaparsing4py.tokenizer import vectorized
 from gammaparsing4py.utils import unfoldPostfix
 
 T = TypeVar("T")
 
+# Default size of the state cache of lazy tokenizers
+MAX_LAZY_STATES = 1 << 12
+
+# Number of characters mapped to class ids at once by retokenize past the edit
+RETOKENIZE_WINDOW = 1 << 10
+
+# Default number of characters of the chunks of tokenizeParallel
+PARALLEL_CHUNK_SIZE = 1 << 20
+
 
 class AVLTreeNode(Generic[T]):
 
@@ -157,6 +195,9 @@ class TokenizerNode(Generic[T]):
         self.entry: tuple[T, bool] = None
         self.tree: AVLTree[TokenizerNode[T]] = AVLTree()
 
+    def getTransitions(self) -> list[tuple[RegexRange, int]]:
+        return [(item.key, item.value.id) for item in self.tree]
+
     def __hash__(self) -> int:
         return self.id
 
@@ -228,36 +269,193 @@ class TokenizerBuildNode(Generic[T]):
         return "TokenizerBuildNode(id={})".format(self.id)
 
 
-def determinize(
-    rootBuildNode: TokenizerBuildNode[T], buildBodes: list[TokenizerBuildNode[T]]
-) -> list[TokenizerNode[T]]:
+def computeEpsilonClosures(buildBodes: list[TokenizerBuildNode[T]]) -> list[int]:
+    """
+    Computes the epsilon closure of every build node, as a bitset of build node ids
+    restricted to the nodes having transitions or an entry, the only ones which
+    matter to the automaton. The strongly connected components of the epsilon
+    transitions are found by Tarjan's algorithm, which completes them after the
+    components they lead to, so that each closure is computed only once
+    """
+    count = len(buildBodes)
+    indexes: list[int] = [-1] * count
+    lowlinks: list[int] = [0] * count
+    onStack: list[bool] = [False] * count
+    stack: list[int] = []
+    closures: list[int] = [0] * count
+    counter = 0
+
+    for start in range(count):
+        if indexes[start] >= 0:
+            continue
+
+        indexes[start] = lowlinks[start] = counter
+        counter += 1
+        stack.append(start)
+        onStack[start] = True
+        work = [(start, iter(buildBodes[start].epsilonTransitions))]
+
+        while work:
+            current, successors = work[-1]
+
+            advanced = False
+            for successor in successors:
+                successor = successor.id
+
+                if indexes[successor] < 0:
+                    indexes[successor] = lowlinks[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    onStack[successor] = True
+                    work.append(
+                        (successor, iter(buildBodes[successor].epsilonTransitions))
+                    )
+                    advanced = True
+                    break
 
-    # Computing epsilon closures
-    epsilonClosures: list[set[TokenizerBuildNode[T]]] = [
-        set([node]) for node in buildBodes
-    ]
+                if onStack[successor]:
+                    lowlinks[current] = min(lowlinks[current], indexes[successor])
+
+            if advanced:
+                continue
 
-    changed = True
-    while changed:
-        changed = False
-        for targetSet in epsilonClosures:
-            previousLength = len(targetSet)
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlinks[parent] = min(lowlinks[parent], lowlinks[current])
 
-            added = set()
-            for node in targetSet:
-                for accessible in node.epsilonTransitions:
-                    added.update(epsilonClosures[accessible.id])
+            if lowlinks[current] != indexes[current]:
+                continue
+
+            # Popping the component, its closure is shared by all its members
+            members: list[int] = []
+            closure = 0
+            while True:
+                member = stack.pop()
+                onStack[member] = False
+                members.append(member)
+                closure |= 1 << member
+                if member == current:
+                    break
+
+            for member in members:
+                for successor in buildBodes[member].epsilonTransitions:
+                    closure |= closures[successor.id]
+
+            for member in members:
+                closures[member] = closure
+
+    relevant = 0
+    for node in buildBodes:
+        if node.transitions or node.entry is not None:
+            relevant |= 1 << node.id
+
+    return [closure & relevant for closure in closures]
+
+
+def bitsetMembers(
+    bits: int, buildBodes: list[TokenizerBuildNode[T]]
+) -> list[TokenizerBuildNode[T]]:
+    digits = bin(bits)[:1:-1]
+
+    members: list[TokenizerBuildNode[T]] = []
+    index = digits.find("1")
+    while index >= 0:
+        members.append(buildBodes[index])
+        index = digits.find("1", index + 1)
+
+    return members
+
+
+def disjointTransitions(
+    members: list[TokenizerBuildNode[T]], epsilonClosures: list[int]
+) -> list[tuple[RegexRange, int]]:
+    """
+    Splits the transitions of a set of build nodes into disjoint ranges, each leading
+    to the union of the closures of the targets of the ranges covering it
+    """
+    grouped: dict[tuple[int, int], int] = {}
+    for node in members:
+        for key, target in node.transitions:
+            bounds = key.start, key.end
+            grouped[bounds] = grouped.get(bounds, 0) | epsilonClosures[target.id]
+
+    points = sorted(
+        set(start for start, _ in grouped) | set(end + 1 for _, end in grouped)
+    )
+    slots: list[int] = [0] * len(points)
+    for (start, end), targetSet in grouped.items():
+        for index in range(bisect_left(points, start), bisect_left(points, end + 1)):
+            slots[index] |= targetSet
+
+    result: list[tuple[RegexRange, int]] = []
+    for index in range(len(points) - 1):
+        targetSet = slots[index]
+        if targetSet == 0:
+            continue
+
+        # Merging adjacent ranges with the same targets
+        previous = result[-1] if result else None
+        if (
+            previous is not None
+            and previous[1] == targetSet
+            and previous[0].end == points[index] - 1
+        ):
+            result[-1] = RegexRange(previous[0].start, points[index + 1] - 1), targetSet
+            continue
+
+        result.append((RegexRange(points[index], points[index + 1] - 1), targetSet))
+
+    return result
+
+
+def resolveEntry(buildNodes: Iterable[TokenizerBuildNode[T]]) -> tuple[T, bool]:
+    """
+    Chooses the entry of a set of build nodes, according to the above sets
+    """
+    entry: tuple[T, bool, set[T]] = None
+    for node in buildNodes:
+        if node.entry is not None:
+            if entry is None:
+                entry = node.entry[0], node.entry[1], set(node.entry[2])
+                continue
+
+            entryKey = entry[0]
+            nodeEntryKey = node.entry[0]
+            if entryKey == nodeEntryKey:
+                entry = entryKey, entry[1] or node.entry[1], entry[2] | node.entry[2]
+                continue
+
+            if entryKey in node.entry[2]:
+                entry = node.entry[0], node.entry[1], set(node.entry[2])
+                continue
 
-            targetSet.update(added)
+            if nodeEntryKey in entry[2]:
+                continue
+
+            raise Exception(
+                "Unable to choose between {} and {}".format(entryKey, nodeEntryKey)
+            )
+
+    if entry is None:
+        return None
 
-            changed |= previousLength != len(targetSet)
+    return entry[0], entry[1]
 
-    # Preparing the mapping
+
+def determinize(
+    rootBuildNode: TokenizerBuildNode[T], buildBodes: list[TokenizerBuildNode[T]]
+) -> list[TokenizerNode[T]]:
+
+    # Computing epsilon closures
+    epsilonClosures = computeEpsilonClosures(buildBodes)
+
+    # Preparing the mapping, sets of build nodes being bitsets of their ids
     nodes: deque[TokenizerNode[T]] = deque()
-    nodeMap: dict[frozenset[TokenizerBuildNode[T]], TokenizerNode[T]] = {}
-    stack: deque[tuple[frozenset[TokenizerBuildNode[T]], TokenizerNode[T]]] = deque()
+    nodeMap: dict[int, TokenizerNode[T]] = {}
+    stack: deque[tuple[int, TokenizerNode[T]]] = deque()
 
-    def nodeFactory(targetSet: frozenset[TokenizerBuildNode[T]]) -> TokenizerNode[T]:
+    def nodeFactory(targetSet: int) -> TokenizerNode[T]:
         node = TokenizerNode(len(nodes))
         nodes.append(node)
         nodeMap[targetSet] = node
@@ -266,60 +464,395 @@ def determinize(
         return node
 
     # Handling the root node
-    rootSet = frozenset(epsilonClosures[rootBuildNode.id])
-    nodeFactory(rootSet)
+    nodeFactory(epsilonClosures[rootBuildNode.id])
 
     while stack:
         currentSet, currentNode = stack.pop()
+        members = bitsetMembers(currentSet, buildBodes)
 
-        entry: tuple[T, bool, set[T]] = None
-        for node in currentSet:
-            if node.entry is not None:
-                if entry is None:
-                    entry = node.entry[0], node.entry[1], set(node.entry[2])
-                    continue
+        currentNode.entry = resolveEntry(members)
 
-                entryKey = entry[0]
-                nodeEntryKey = node.entry[0]
-                if entryKey == nodeEntryKey:
-                    entry[1] |= node.entry[1]
-                    entry[2].update(node.entry[2])
-                    continue
+        for key, closedSet in disjointTransitions(members, epsilonClosures):
+            targetNode = nodeMap.get(closedSet)
+            if targetNode is None:
+                targetNode = nodeFactory(closedSet)
+
+            currentNode.tree.insert(key, targetNode)
+
+    return nodes
 
-                if entryKey in node.entry[2]:
-                    entry = node.entry[0], node.entry[1], set(node.entry[2])
-                    continue
 
-                if nodeEntryKey in entry[2]:
+def minimize(nodes: list[TokenizerNode[T]]) -> list[TokenizerNode[T]]:
+    """
+    Minimizes the given automaton using Hopcroft's algorithm, over the equivalence
+    classes of its alphabet. States with distinct entries are never merged
+    """
+    rows = [node.getTransitions() for node in nodes]
+    points, intervalClasses = computeClasses(rows)
+    numClasses = max(intervalClasses) + 1
+
+    # Completing the automaton with a dead state
+    dead = len(nodes)
+    delta: list[list[int]] = [[dead] * numClasses for _ in range(len(nodes) + 1)]
+    for state, row in enumerate(rows):
+        for key, target in row:
+            for index in range(
+                bisect_left(points, key.start), bisect_left(points, key.end + 1)
+            ):
+                delta[state][intervalClasses[index]] = target
+
+    inverse: list[dict[int, list[int]]] = [{} for _ in range(numClasses)]
+    for state, targets in enumerate(delta):
+        for symbol, target in enumerate(targets):
+            inverse[symbol].setdefault(target, []).append(state)
+
+    # Initial partition, according to entries
+    blocks: list[set[int]] = []
+    blockOf: list[int] = [0] * (len(nodes) + 1)
+    blockIds: dict[tuple[T, bool], int] = {}
+    for state in range(len(nodes) + 1):
+        entry = nodes[state].entry if state < dead else None
+        if entry not in blockIds:
+            blockIds[entry] = len(blocks)
+            blocks.append(set())
+        blocks[blockIds[entry]].add(state)
+        blockOf[state] = blockIds[entry]
+
+    waiting: set[int] = set(range(len(blocks)))
+
+    # Refining
+    while waiting:
+        splitter = list(blocks[waiting.pop()])
+
+        for symbol in range(numClasses):
+            touched: dict[int, set[int]] = {}
+            for target in splitter:
+                for state in inverse[symbol].get(target, ()):
+                    touched.setdefault(blockOf[state], set()).add(state)
+
+            for blockId, intersection in touched.items():
+                if len(intersection) == len(blocks[blockId]):
                     continue
 
-                raise Exception(
-                    "Unable to choose between {} and {}".format(entryKey, nodeEntryKey)
-                )
+                newId = len(blocks)
+                blocks.append(intersection)
+                blocks[blockId] -= intersection
+                for state in intersection:
+                    blockOf[state] = newId
+
+                if blockId in waiting or len(intersection) <= len(blocks[blockId]):
+                    waiting.add(newId)
+                else:
+                    waiting.add(blockId)
+
+    # Building the resulting nodes, numbered in discovery order from the root
+    result: list[TokenizerNode[T]] = []
+    blockNodes: dict[int, TokenizerNode[T]] = {}
+    stack: deque[int] = deque()
+
+    def nodeFactory(blockId: int) -> TokenizerNode[T]:
+        node = TokenizerNode(len(result))
+        node.entry = nodes[next(iter(blocks[blockId]))].entry
+        result.append(node)
+        blockNodes[blockId] = node
+        stack.append(blockId)
+        return node
 
-        if entry is not None:
-            currentNode.entry = entry[0], entry[1]
+    nodeFactory(blockOf[0])
+    while stack:
+        blockId = stack.popleft()
+        current = blockNodes[blockId]
+        representative = nodes[next(iter(blocks[blockId]))]
+
+        # Merging adjacent ranges leading to the same node
+        merged: list[tuple[RegexRange, int]] = []
+        for item in sorted(representative.tree, key=lambda item: item.key.start):
+            targetBlock = blockOf[item.value.id]
+            if targetBlock == blockOf[dead]:
+                continue
 
-        transitions: list[tuple[RegexRange, TokenizerBuildNode[T]]] = (
-            RegexRange.disjointValuedList(
-                itertools.chain.from_iterable(
-                    map(TokenizerBuildNode.getWrappedTransitions, currentSet)
-                )
-            )
-        )
+            if (
+                merged
+                and merged[-1][1] == targetBlock
+                and merged[-1][0].end + 1 == item.key.start
+            ):
+                merged[-1][0].end = item.key.end
+            else:
+                merged.append((item.key.copy(), targetBlock))
+
+        for key, targetBlock in merged:
+            targetNode = blockNodes.get(targetBlock)
+            if targetNode is None:
+                targetNode = nodeFactory(targetBlock)
+
+            current.tree.insert(key, targetNode)
+
+    return result
+
+
+def buildAutomaton(
+    entries: list[tuple[Regex, T, bool, set[T]]]
+) -> tuple[TokenizerBuildNode[T], deque[TokenizerBuildNode[T]]]:
+    buildNodes: deque[TokenizerBuildNode[T]] = deque()
+
+    def buildNodeFactory() -> TokenizerBuildNode[T]:
+        node = TokenizerBuildNode(len(buildNodes))
+        buildNodes.append(node)
+        return node
+
+    rootNode = buildNodeFactory()
+
+    for pattern, value, reluctant, above in entries:
+        stack: deque[tuple[TokenizerBuildNode[T], TokenizerBuildNode[T]]] = deque()
+
+        for fragment in reversed(unfoldPostfix(pattern, getRegexChildren)):
+
+            if isinstance(fragment, RegexClass):
+                start, end = buildNodeFactory(), buildNodeFactory()
+
+                for range in fragment.ranges:
+                    start.transitions.append((range, end))
+
+                stack.append((start, end))
+                continue
+
+            if isinstance(fragment, RegexQuantified):
+                start, end = buildNodeFactory(), buildNodeFactory()
+                pstart, pend = stack.pop()
+
+                start.epsilonTransitions.add(pstart)
+                pend.epsilonTransitions.add(end)
+
+                if fragment.quantifier == RegexQuantified.STAR:
+                    start.epsilonTransitions.add(end)
+                    end.epsilonTransitions.add(start)
+
+                if fragment.quantifier == RegexQuantified.PLUS:
+                    end.epsilonTransitions.add(start)
+
+                if fragment.quantifier == RegexQuantified.INTERROGATION_MARK:
+                    start.epsilonTransitions.add(end)
+
+                stack.append((start, end))
+                continue
+
+            if isinstance(fragment, RegexSequence):
+                start = buildNodeFactory()
+                end = start
+
+                for _ in fragment.getChildren():
+                    itemStart, itemEnd = stack.pop()
+                    end.epsilonTransitions.add(itemStart)
+                    end = itemEnd
+
+                stack.append((start, end))
+                continue
+
+            if isinstance(fragment, RegexChoice):
+                start, end = buildNodeFactory(), buildNodeFactory()
+
+                for _ in fragment.getChildren():
+                    itemStart, itemEnd = stack.pop()
 
-        for key, targets in transitions:
-            closedSet = frozenset(
-                itertools.chain.from_iterable(
-                    map(lambda node: epsilonClosures[node.id], targets)
+                    start.epsilonTransitions.add(itemStart)
+                    itemEnd.epsilonTransitions.add(end)
+
+                stack.append((start, end))
+
+        start, end = stack.pop()
+        rootNode.epsilonTransitions.add(start)
+        end.entry = value, reluctant, above
+
+    return rootNode, buildNodes
+
+
+def buildPositionAutomaton(
+    entries: list[tuple[Regex, T, bool, set[T]]]
+) -> tuple[TokenizerBuildNode[T], deque[TokenizerBuildNode[T]]]:
+    """
+    Glushkov construction, with a build node per position of each pattern, see
+    gammaparsing4py.tokenizer.glushkov. The only epsilon transitions lead from the
+    root to the entries of the patterns matching the empty string. Positions having
+    the same followers share their list of transitions
+    """
+    buildNodes: deque[TokenizerBuildNode[T]] = deque()
+
+    def buildNodeFactory() -> TokenizerBuildNode[T]:
+        node = TokenizerBuildNode(len(buildNodes))
+        buildNodes.append(node)
+        return node
+
+    rootNode = buildNodeFactory()
+
+    for pattern, value, reluctant, above in entries:
+        positions = PositionSets.of(pattern)
+        positionNodes = [buildNodeFactory() for _ in positions.ranges]
+
+        edges: dict[frozenset[int], list[tuple[RegexRange, TokenizerBuildNode[T]]]] = {}
+
+        def edgesOf(targets: frozenset[int]):
+            if targets not in edges:
+                edges[targets] = [
+                    (range, positionNodes[target])
+                    for target in sorted(targets)
+                    for range in positions.ranges[target]
+                ]
+            return edges[targets]
+
+        rootNode.transitions.extend(edgesOf(positions.first))
+
+        for position, following in enumerate(positions.follow):
+            following = list(dict.fromkeys(following))
+
+            if len(following) == 1:
+                positionNodes[position].transitions = edgesOf(following[0])
+            elif len(following) > 1:
+                positionNodes[position].transitions = edgesOf(
+                    frozenset().union(*following)
                 )
-            )
 
-            targetNode = nodeMap.get(closedSet)
-            if targetNode is None:
-                targetNode = nodeFactory(closedSet)
+        for position in positions.last:
+            positionNodes[position].entry = value, reluctant, above
+
+        if positions.nullable:
+            node = buildNodeFactory()
+            node.entry = value, reluctant, above
+            rootNode.epsilonTransitions.add(node)
+
+    return rootNode, buildNodes
+
+
+def encodeTransition(
+    state: TokenizerBuildNode[T],
+    key: RegexRange,
+    target: TokenizerBuildNode[T],
+    buildNodeFactory: Callable[[], TokenizerBuildNode[T]],
+):
+    """
+    Adds the chains of byte ranges encoding the given transition in UTF-8 to the
+    build node state, see gammaparsing4py.tokenizer.utf8
+    """
+    for sequence in utf8Sequences(key.start, key.end):
+        current = state
+
+        for start, end in sequence[:-1]:
+            following = buildNodeFactory()
+            current.transitions.append((RegexRange(start, end), following))
+            current = following
+
+        start, end = sequence[-1]
+        current.transitions.append((RegexRange(start, end), target))
+
+
+def encodeAutomaton(nodes: list[TokenizerNode[T]]) -> list[TokenizerNode[T]]:
+    """
+    Builds the minimal automaton running over the UTF-8 encoding of what the given
+    automaton reads: each transition is replaced by chains of byte ranges, see
+    encodeTransition, the chains sharing a prefix being merged by determinization.
+    Encoded characters are only accepted once complete
+    """
+    buildNodes: deque[TokenizerBuildNode[T]] = deque()
+
+    def buildNodeFactory() -> TokenizerBuildNode[T]:
+        node = TokenizerBuildNode(len(buildNodes))
+        buildNodes.append(node)
+        return node
 
-            currentNode.tree.insert(key, targetNode)
+    states = [buildNodeFactory() for _ in nodes]
+
+    for node, state in zip(nodes, states):
+        if node.entry is not None:
+            state.entry = node.entry[0], node.entry[1], set()
+
+        for key, target in node.getTransitions():
+            encodeTransition(state, key, states[target], buildNodeFactory)
+
+    return minimize(determinize(states[0], buildNodes))
+
+
+def encodeBuildNodes(
+    rootBuildNode: TokenizerBuildNode[T], buildNodes: list[TokenizerBuildNode[T]]
+) -> tuple[TokenizerBuildNode[T], deque[TokenizerBuildNode[T]]]:
+    """
+    Builds the non-deterministic automaton running over the UTF-8 encoding of what
+    the given one reads, like encodeAutomaton, epsilon transitions being kept
+    """
+    encoded: deque[TokenizerBuildNode[T]] = deque()
+
+    def buildNodeFactory() -> TokenizerBuildNode[T]:
+        node = TokenizerBuildNode(len(encoded))
+        encoded.append(node)
+        return node
+
+    states = [buildNodeFactory() for _ in buildNodes]
+
+    for node, state in zip(buildNodes, states):
+        state.entry = node.entry
+        state.epsilonTransitions = {
+            states[target.id] for target in node.epsilonTransitions
+        }
+
+        for key, target in node.transitions:
+            encodeTransition(state, key, states[target.id], buildNodeFactory)
+
+    return states[rootBuildNode.id], encoded
+
+
+def literalText(pattern: Regex) -> str:
+    """
+    Returns the only text matched by the pattern if it is a plain sequence of
+    characters, None otherwise
+    """
+    items = pattern.items if isinstance(pattern, RegexSequence) else [pattern]
+
+    chars: list[str] = []
+    for item in items:
+        if (
+            not isinstance(item, RegexClass)
+            or len(item.ranges) != 1
+            or item.ranges[0].start != item.ranges[0].end
+        ):
+            return None
+        chars.append(chr(item.ranges[0].start))
+
+    return "".join(chars)
+
+
+def matchedEntry(nodes: list[TokenizerNode[T]], text: str) -> tuple[T, bool]:
+    """
+    Runs a deterministic automaton over the whole text, returning the entry reached
+    """
+    node = nodes[0]
+    for char in text:
+        node = node.tree.find(ord(char))
+        if node is None:
+            return None
+
+    return node.entry
+
+
+def keyName(key) -> str:
+    """
+    Returns the name under which a key is saved: strings are their own names, other
+    keys need a name attribute. Returns None for keys without a name
+    """
+    if key is None or isinstance(key, str):
+        return key
+
+    name = getattr(key, "name", None)
+    return name if isinstance(name, str) else None
+
+
+def tableNodes(table: TokenizerTable, keys: list[T]) -> list[TokenizerNode[T]]:
+    """
+    Rebuilds the nodes of an automaton from its table
+    """
+    nodes = [TokenizerNode(id) for id in range(table.numStates)]
+    for node, row in zip(nodes, table.rows()):
+        for key, target in row:
+            node.tree.insert(key, nodes[target])
+        if table.accepts[node.id] >= 0:
+            node.entry = (keys[table.accepts[node.id]], bool(table.stops[node.id]))
 
     return nodes
 
@@ -336,138 +869,977 @@ class TokenizerBuilder(Generic[T]):
             (parseRegex(CharFlow.fromString(pattern)), value, reluctant, above)
         )
 
+    def splitKeywords(
+        self, skipped: set[T] = set()
+    ) -> tuple[list[tuple[Regex, T, bool, set[T]]], dict[T, dict[str, T]]]:
+        """
+        Separates the keywords from the other entries. A keyword is a literal pattern
+        whose text is matched by patterns of a single other key, which it is above,
+        none of them being reluctant. Keywords are left out of the automaton, the
+        lexemes of the key covering them being reclassified by their text instead.
+        Returns the remaining entries, and the keywords of each covering key
+        """
+        texts = [literalText(entry[0]) for entry in self.entries]
+        general = [
+            (determinize(*buildAutomaton([entry])), entry)
+            for entry, text in zip(self.entries, texts)
+            if text is None
+        ]
+
+        # Literal entries by text, entries sharing a text being kept or left together
+        literals: dict[str, list[tuple[Regex, T, bool, set[T]]]] = {}
+        for entry, text in zip(self.entries, texts):
+            if text:
+                literals.setdefault(text, []).append(entry)
+
+        keywords: dict[T, dict[str, T]] = {}
+        left: set[str] = set()
+
+        for text, group in literals.items():
+            value = group[0][1]
+            above = set().union(*(entry[3] for entry in group))
+
+            covering = set(
+                entry[1]
+                for nodes, entry in general
+                if matchedEntry(nodes, text) is not None
+            )
+            coveringKey = next(iter(covering)) if len(covering) == 1 else None
+
+            if (
+                any(entry[1] != value or entry[2] for entry in group)
+                or coveringKey is None
+                or coveringKey == value
+                or coveringKey not in above
+                or (coveringKey in skipped) != (value in skipped)
+                or any(entry[2] for _, entry in general if entry[1] == coveringKey)
+            ):
+                continue
+
+            keywords.setdefault(coveringKey, {})[text] = value
+            left.add(text)
+
+        entries = [
+            entry for entry, text in zip(self.entries, texts) if text not in left
+        ]
+
+        return entries, keywords
+
     def build(
         self,
         eof: T = None,
+        minimized: bool = True,
+        native: bool = False,
+        skipped: set[T] = set(),
+        glushkov: bool = False,
+        keywords: bool = False,
     ):
-        buildNodes: deque[TokenizerBuildNode[T]] = deque()
+        """
+        Builds the tokenizer. If keywords is True, keywords are reclassified by a
+        dictionary lookup instead of being part of the automaton, see splitKeywords
+        """
+        entries, reclassified = (
+            self.splitKeywords(skipped) if keywords else (self.entries, {})
+        )
 
-        def buildNodeFactory() -> TokenizerBuildNode[T]:
-            node = TokenizerBuildNode(len(buildNodes))
-            buildNodes.append(node)
-            return node
+        construction = buildPositionAutomaton if glushkov else buildAutomaton
+        nodes = determinize(*construction(entries))
+        if minimized:
+            nodes = minimize(nodes)
+
+        tokenizer = Tokenizer(nodes, eof=eof, skipped=skipped, keywords=reclassified)
+
+        if native:
+            tokenizer.native = NativeScanner.of(
+                [
+                    (minimize(determinize(*buildAutomaton([entry]))), *entry[1:])
+                    for entry in entries
+                ],
+                tokenizer.keyIds,
+                tokenizer.table,
+            )
 
-        rootNode = buildNodeFactory()
+        return tokenizer
 
-        for pattern, value, reluctant, above in self.entries:
-            stack: deque[tuple[TokenizerBuildNode[T], TokenizerBuildNode[T]]] = deque()
+    def buildLazy(
+        self,
+        eof: T = None,
+        skipped: set[T] = set(),
+        maxStates: int = MAX_LAZY_STATES,
+        glushkov: bool = False,
+        keywords: bool = False,
+    ):
+        """
+        Builds a tokenizer determinizing its automaton on the fly, see LazyTokenizer.
+        Keywords are reclassified by a dictionary lookup if keywords is True, see
+        build
+        """
+        entries, reclassified = (
+            self.splitKeywords(skipped) if keywords else (self.entries, {})
+        )
 
-            for fragment in reversed(unfoldPostfix(pattern, getRegexChildren)):
+        construction = buildPositionAutomaton if glushkov else buildAutomaton
+        rootBuildNode, buildNodes = construction(entries)
 
-                if isinstance(fragment, RegexClass):
-                    start, end = buildNodeFactory(), buildNodeFactory()
+        return LazyTokenizer(
+            rootBuildNode,
+            buildNodes,
+            eof=eof,
+            skipped=skipped,
+            maxStates=maxStates,
+            keywords=reclassified,
+        )
 
-                    for range in fragment.ranges:
-                        start.transitions.append((range, end))
 
-                    stack.append((start, end))
-                    continue
+class Tokenizer(Generic[T]):
 
-                if isinstance(fragment, RegexQuantified):
-                    start, end = buildNodeFactory(), buildNodeFactory()
-                    pstart, pend = stack.pop()
+    def __init__(
+        self,
+        nodes: list[TokenizerNode[T]],
+        eof: T = None,
+        skipper: Callable[[Token[T]], bool] = keepAll,
+        skipped: set[T] = set(),
+        keywords: dict[T, dict[str, T]] = {},
+        table: TokenizerTable = None,
+        keys: list[T] = None,
+    ):
+        self._nodes: list[TokenizerNode[T]] = nodes
+        self.eof: T = eof
+        self.skipper: Callable[[Token[T]], bool] = skipper
 
-                    start.epsilonTransitions.add(pstart)
-                    pend.epsilonTransitions.add(end)
+        # Keys whose lexemes are discarded by the automaton itself
+        self.skipped: set[T] = set(skipped)
+
+        # Table of the keys which can be produced, used by token buffers. Loaded
+        # tokenizers are given their table and its keys instead of nodes
+        self.keys: list[T] = [eof] if keys is None else list(keys)
+        self.keyIds: dict[T, int] = {key: id for id, key in enumerate(self.keys)}
+        if keys is None:
+            for node in nodes:
+                if node.entry is not None and node.entry[0] not in self.keyIds:
+                    self.keyIds[node.entry[0]] = len(self.keys)
+                    self.keys.append(node.entry[0])
+        self._addKeywords(keywords)
+        self.discarded: set[int] = {
+            self.keyIds[key] for key in self.skipped if key in self.keyIds
+        }
+
+        # The table is only given when loading a saved tokenizer
+        if table is None:
+            table = TokenizerTable.of(
+                [node.getTransitions() for node in nodes],
+                [
+                    (
+                        (self.keyIds[node.entry[0]], node.entry[1])
+                        if node.entry is not None
+                        else None
+                    )
+                    for node in nodes
+                ],
+                self.discarded,
+            )
+        self.table: TokenizerTable = table
+        self.accelerations: Accelerations = None
+
+        self.matcher: Callable[[str, int, int, FailureMemo], tuple[int, int]] = None
+        self.native: NativeScanner[T] = None
+        self.encoded: Tokenizer[T] = None
+
+    def _addKeywords(self, keywords: dict[T, dict[str, T]]):
+        """
+        Registers the keywords reclassifying the lexemes of their covering keys
+        """
+        self.keywords: dict[T, dict[str, T]] = keywords
+
+        for texts in keywords.values():
+            for key in texts.values():
+                if key not in self.keyIds:
+                    self.keyIds[key] = len(self.keys)
+                    self.keys.append(key)
+
+        # Keywords of each key id by text, None for keys which are never reclassified
+        self.reclassified: list[dict[str, int]] = [None] * len(self.keys)
+        for key, texts in keywords.items():
+            if key in self.keyIds:
+                self.reclassified[self.keyIds[key]] = {
+                    text: self.keyIds[value] for text, value in texts.items()
+                }
+
+    def readToken(
+        self, flow: CharFlow, failures: FailureMemo = None, classes: FlowClasses = None
+    ) -> Token[T]:
+        """
+        Reads the next token from the flow, lexemes of skipped keys being discarded.
+        Characters are scanned one at a time by the shared loop, see FlowClasses,
+        unless given the classes of an iterator, which scans buffered flows in place.
+        Returns None if the scanning waits for an AsyncCharFlow to receive more data
+        """
+        if classes is None:
+            if failures is None:
+                failures = FailureMemo(self.table)
+            classes = FlowClasses(flow, self.table, failures)
+        else:
+            classes.sync()
+
+        matches = classes.matches
+        discarded = self.discarded
+        reclassified = self.reclassified
+
+        while True:
+            if not flow.hasMore():
+                offset = flow.offset
+                return Token(
+                    self.eof, None, None, None, offset, offset, None, flow.positions
+                )
 
-                    if fragment.quantifier == RegexQuantified.STAR:
-                        start.epsilonTransitions.add(end)
-                        end.epsilonTransitions.add(start)
+            start = flow.mark()
+            match = next(matches)
+            if match is None:
+                return None
+
+            accept, end, _ = match
+            if end != classes.offset:
+                classes.seek(end)
+
+            if accept < 0:
+                text = flow.slice(start, end)
+                if len(text) == 0 and flow.hasMore():
+                    code = flow.peek()
+                    text = chr(code) if flow.encoding is None else bytes([code])
+                if not isinstance(text, str):
+                    text = str(text, "utf-8", "replace")
+                raise unparsable(text, start, flow.positions)
+
+            if accept in discarded:
+                continue
 
-                    if fragment.quantifier == RegexQuantified.PLUS:
-                        end.epsilonTransitions.add(start)
+            texts = reclassified[accept]
+            if texts is not None:
+                lexeme = flow.slice(start, end)
+                if not isinstance(lexeme, str):
+                    lexeme = str(lexeme, "utf-8")
+                accept = texts.get(lexeme, accept)
+
+            if flow.source is not None:
+                return Token(
+                    self.keys[accept],
+                    None,
+                    None,
+                    None,
+                    start,
+                    end,
+                    flow.source,
+                    flow.positions,
+                )
+            return Token(
+                self.keys[accept],
+                flow.slice(start, end),
+                None,
+                None,
+                start,
+                end,
+                None,
+                flow.positions,
+            )
 
-                    if fragment.quantifier == RegexQuantified.INTERROGATION_MARK:
-                        start.epsilonTransitions.add(end)
+    def nextToken(
+        self, flow: CharFlow, failures: FailureMemo = None, classes: FlowClasses = None
+    ) -> Token[T]:
+        result: Token[T] = self.readToken(flow, failures, classes)
 
-                    stack.append((start, end))
-                    continue
+        while result is not None and self.skipper(result):
+            result = self.readToken(flow, failures, classes)
 
-                if isinstance(fragment, RegexSequence):
-                    start = buildNodeFactory()
-                    end = start
+        return result
 
-                    for _ in fragment.getChildren():
-                        itemStart, itemEnd = stack.pop()
-                        end.epsilonTransitions.add(itemStart)
-                        end = itemEnd
+    def iterator(self, flow: CharFlow):
+        """
+        Iterates over the tokens of the flow, flows serving UTF-8 bytes being scanned
+        by the byte-level automaton, see utf8
+        """
+        if flow.encoding == "utf-8":
+            return TokenizerIterator(self.utf8(), flow)
 
-                    stack.append((start, end))
-                    continue
+        return TokenizerIterator(self, flow)
 
-                if isinstance(fragment, RegexChoice):
-                    start, end = buildNodeFactory(), buildNodeFactory()
+    def asyncIterator(self, flow: AsyncCharFlow) -> AsyncTokenizerIterator[T]:
+        return AsyncTokenizerIterator(self, flow)
+
+    @property
+    def nodes(self) -> list[TokenizerNode[T]]:
+        """
+        Nodes of the automaton, rebuilt from the table when first needed by loaded
+        tokenizers
+        """
+        if self._nodes is None:
+            self._nodes = tableNodes(self.table, self.keys)
+
+        return self._nodes
+
+    def rows(self) -> list[list[tuple[RegexRange, int]]]:
+        """
+        Returns the transitions of each state, read from the table if the nodes
+        aren't built
+        """
+        if self._nodes is None:
+            return self.table.rows()
+
+        return [node.getTransitions() for node in self._nodes]
+
+    def accelerate(self) -> Accelerations:
+        """
+        Returns the accelerated states of the table, see Accelerations. They are
+        detected on first bulk use, then cached, so that loading a saved tokenizer
+        compiles no pattern
+        """
+        if self.accelerations is None:
+            self.accelerations = Accelerations.of(self.rows(), self.table)
+
+        return self.accelerations
+
+    def compile(self) -> Callable[[str, int, int, FailureMemo], tuple[int, int]]:
+        """
+        Returns a matching function generated specifically for this automaton, see
+        gammaparsing4py.tokenizer.codegen. It is generated once, then cached
+        """
+        if self.matcher is None:
+            self.matcher = compileMatcher(self.rows(), self.table)
+
+        return self.matcher
+
+    def __getstate__(self) -> dict:
+        """
+        Compiled matchers can't be pickled, they are generated again when needed
+        """
+        state = self.__dict__.copy()
+        state["matcher"] = None
+        return state
+
+    def compiledIterator(self, text: str) -> Iterator[Token[T]]:
+        return self._iterateString(text, self.compile())
+
+    def nativeIterator(self, text: str) -> Iterator[Token[T]]:
+        """
+        Iterates over the tokens of text using the re backend, available if the
+        tokenizer has been built with native=True and its patterns could be
+        translated faithfully. Falls back to the compiled matcher otherwise
+        """
+        if self.native is None:
+            return self.compiledIterator(text)
+
+        return self._iterateString(text, self.native.match)
+
+    def vectorizedIterator(self, text: str) -> Iterator[Token[T]]:
+        """
+        Iterates over the tokens of text like iterator, the class ids of its characters
+        and the positions of the tokens being computed by NumPy beforehand, see
+        gammaparsing4py.tokenizer.vectorized. As the whole text is scanned before the
+        first token is yielded, unparsable text raises from the first step. Falls back
+        to iterator if NumPy isn't installed
+        """
+        if vectorized.numpy is None:
+            yield from self.iterator(CharFlow.fromString(text))
+            return
+
+        buffer = tokenizeSource(self, text, vectorized.classIds(self.table, text))
+        lines, columns = vectorized.linePositions(text, buffer.starts)
+
+        keys = self.keys
+        source = buffer.source
+        positions = buffer.positions
+        last = len(buffer) - 1
+
+        for keyId, start, end, line, column in itertools.islice(
+            zip(buffer.ids, buffer.starts, buffer.ends, lines, columns), last
+        ):
+            yield Token(keys[keyId], None, line, column, start, end, source, positions)
+
+        yield Token(
+            self.eof,
+            None,
+            lines[last],
+            columns[last],
+            buffer.starts[last],
+            buffer.ends[last],
+            None,
+            positions,
+        )
 
-                    for _ in fragment.getChildren():
-                        itemStart, itemEnd = stack.pop()
+    def _iterateString(
+        self, text: str, match: Callable[[str, int, int, FailureMemo], tuple[int, int]]
+    ) -> Iterator[Token[T]]:
+        keys = self.keys
+        reclassified = self.reclassified
+        skipper = self.skipper
+        discarded = self.discarded
+        failures = FailureMemo(self.table)
+
+        positions = LineIndex(text)
+        length = len(text)
+        position = 0
+
+        while position < length:
+            accept, end = match(text, position, length, failures)
+
+            if accept < 0:
+                raise unparsable(
+                    text[position:end] or text[position], position, positions
+                )
 
-                        start.epsilonTransitions.add(itemStart)
-                        itemEnd.epsilonTransitions.add(end)
+            if accept in discarded:
+                position = end
+                continue
 
-                    stack.append((start, end))
+            texts = reclassified[accept]
+            if texts is not None:
+                accept = texts.get(text[position:end], accept)
 
-            start, end = stack.pop()
-            rootNode.epsilonTransitions.add(start)
-            end.entry = value, reluctant, above
+            token = Token(
+                keys[accept], None, None, None, position, end, text, positions
+            )
+            position = end
 
-        return Tokenizer(determinize(rootNode, buildNodes), eof=eof)
+            if not skipper(token):
+                yield token
 
+        yield Token(self.eof, None, None, None, length, length, None, positions)
 
-class Tokenizer(Generic[T]):
+    def tokenize(self, flow: CharFlow) -> TokenBuffer[T]:
+        buffer = TokenBuffer(self.keys, flow.source, flow.positions)
+        keyIds = self.keyIds
+        stored = buffer.texts is not None
 
-    def __init__(
-        self,
-        nodes: list[TokenizerNode[T]],
-        eof: T = None,
-        skipper: Callable[[Token[T]], bool] = lambda token: False,
-    ):
-        self.nodes: list[TokenizerNode[T]] = nodes
-        self.eof: T = eof
-        self.skipper: Callable[[Token[T]], bool] = skipper
+        for token in self.iterator(flow):
+            buffer.append(
+                keyIds[token.key],
+                token.start,
+                token.end,
+                token.data if stored else None,
+            )
 
-    def readToken(self, flow: CharFlow) -> Token[T]:
-        if not flow.hasMore():
-            return Token(self.eof, None, flow.line, flow.column)
+        return buffer
+
+    def tokenizeAll(self, text: str) -> TokenBuffer[T]:
+        """
+        Tokenizes a whole string at once, without any flow nor iterator. The class ids
+        of its characters are computed at once, then scanned by a single loop, see
+        gammaparsing4py.tokenizer.bulk
+        """
+        return tokenizeSource(self, text)
+
+    def retokenize(
+        self, buffer: TokenBuffer[T], offset: int, removed: int, inserted: str
+    ) -> TokenBuffer[T]:
+        """
+        Tokenizes the source of a buffer given by tokenizeAll once edited, the removed
+        characters located at offset being replaced by the inserted ones. Scanning
+        resumes after the last token whose reading, like the reading of every token
+        before it, stopped before the edit. It stops at the first offset after the
+        edit where the previous scanning had started too, the previous tokens being
+        reused from there. Only the rescanned characters are mapped to class ids
+        """
+        source = buffer.source
+        if not isinstance(source, str):
+            raise Exception("Only buffers tokenized from strings can be edited")
+
+        text = source[:offset] + inserted + source[offset + removed :]
+        if buffer.keys is not self.keys or len(buffer.reaches) != len(buffer.ids):
+            return self.tokenizeAll(text)
+
+        # Tokens left untouched by the edit
+        kept = bisect_right(buffer.reaches, offset)
+        position = buffer.ends[kept - 1] if kept > 0 else 0
+
+        positions = buffer.positions.edited(text, offset, removed, len(inserted))
+        result = TokenBuffer(self.keys, text, positions)
+        result.ids = buffer.ids[:kept]
+        result.starts = buffer.starts[:kept]
+        result.ends = buffer.ends[:kept]
+        result.reaches = buffer.reaches[:kept]
+
+        return tokenizeSource(
+            self,
+            text,
+            None,
+            position,
+            result,
+            buffer,
+            offset + len(inserted),
+            len(inserted) - removed,
+            None,
+            RETOKENIZE_WINDOW,
+        )
 
-        buffer = StringIO()
-        line = flow.line
-        column = flow.column
+    def tokenizeParallel(
+        self,
+        text: str,
+        workers: int = None,
+        chunkSize: int = PARALLEL_CHUNK_SIZE,
+        separator: str = None,
+        context: BaseContext = None,
+    ) -> TokenBuffer[T]:
+        """
+        Tokenizes a large string at once like tokenizeAll, its chunks being tokenized
+        speculatively by a pool of worker processes, each as if a token started at its
+        first character. Tokens are then stitched in order: scanning resumes after the
+        tokens kept so far until it starts where the scanning of the next chunk
+        started too, the tokens of this chunk being reused from there, see retokenize.
+        Given a separator, such as a line break, chunks start right after one, making
+        their speculative tokens likely to be the right ones. Workers are started
+        from the given multiprocessing context, if any, and only receive the arrays of
+        the table, the keys and the skipper, which is applied once tokens are stitched
+        if it can't be pickled
+        """
+        length = len(text)
+        if length <= chunkSize:
+            return self.tokenizeAll(text)
+
+        # Computing the starts of the chunks
+        bounds = [0]
+        while bounds[-1] + chunkSize < length:
+            start = bounds[-1] + chunkSize
+            if separator is not None:
+                found = text.find(separator, start)
+                if found < 0:
+                    break
+                start = found + len(separator)
+            if start >= length:
+                break
+            bounds.append(start)
+        bounds.append(length)
+
+        skipper = self.skipper
+        try:
+            pickle.dumps(skipper)
+        except Exception:
+            skipper = keepAll
+
+        table = self.table
+        tokenizer = ChunkTokenizer(
+            table,
+            self.keys,
+            self.reclassified,
+            self.discarded,
+            skipper,
+            self.accelerate(),
+        )
+
+        with ProcessPoolExecutor(
+            workers,
+            mp_context=context,
+            initializer=initChunkWorker,
+            initargs=(
+                table.numClasses,
+                table.limit,
+                table.arrays(),
+                self.keys,
+                self.reclassified,
+                self.discarded,
+                skipper,
+            ),
+        ) as executor:
+            chunks = list(
+                executor.map(
+                    tokenizeChunk,
+                    [text[start:end] for start, end in zip(bounds, bounds[1:])],
+                    bounds[:-1],
+                    [index == len(bounds) - 2 for index in range(len(bounds) - 1)],
+                )
+            )
 
-        current = self.nodes[0]
+        # Stitching the tokens of the chunks
+        classes = table.classIds(text)
+        result = TokenBuffer(self.keys, text, LineIndex(text))
 
-        while flow.hasMore():
-            if current.entry is not None and current.entry[1]:
+        for start, (ids, starts, ends, reaches, complete) in zip(bounds, chunks):
+            # Only the end of data token starts at the end
+            if len(result) > 0 and result.starts[-1] == length:
                 break
 
-            nextNode = current.tree.find(flow.peek())
+            chunk = TokenBuffer(self.keys, text, result.positions)
+            chunk.ids, chunk.starts, chunk.ends = ids, starts, ends
+            chunk.reaches = reaches
+
+            # Syncing gives up past the end of the kept tokens of the chunk
+            tokenizeSource(
+                tokenizer,
+                text,
+                classes,
+                result.ends[-1] if len(result) > 0 else 0,
+                result,
+                chunk,
+                start,
+                0,
+                None if complete else ends[-1] if len(ends) > 0 else start,
+            )
 
-            if nextNode is None:
-                break
+        if len(result) == 0 or result.starts[-1] < length:
+            tokenizeSource(
+                tokenizer,
+                text,
+                classes,
+                result.ends[-1] if len(result) > 0 else 0,
+                result,
+            )
 
-            buffer.write(chr(flow.next()))
-            current = nextNode
+        if skipper is not self.skipper:
+            return skipTokens(result, self.skipper)
 
-        if current.entry is not None:
-            return Token(current.entry[0], buffer.getvalue(), line, column)
+        return result
+
+    def tokenizeBytes(self, data: bytes, encoding: str = "utf-8") -> TokenBuffer[T]:
+        """
+        Tokenizes encoded data at once. ASCII data is scanned directly and UTF-8 data
+        by the byte-level automaton, see utf8, offsets then being byte offsets. Data
+        in other encodings is decoded first, offsets then being character offsets in
+        the decoded string, which is the source of the tokens. Any bytes-like data can
+        be given, such as an mmap
+        """
+        if isinstance(data, (bytes, bytearray)) and data.isascii():
+            return tokenizeSource(self, data)
+
+        if codecs.lookup(encoding).name == "utf-8":
+            return tokenizeSource(self.utf8(), data)
+
+        return self.tokenizeAll(str(data, encoding))
+
+    def tokenizeFile(self, path: str) -> TokenBuffer[T]:
+        """
+        Tokenizes a UTF-8 file at once, mapping it in memory instead of reading it,
+        see tokenizeBytes. Tokens refer to the mapping, which stays open as long as
+        they do. Their data is copied out of it, their view being zero-copy
+        """
+        return self.tokenizeBytes(mapFile(path))
+
+    def utf8(self) -> Tokenizer[T]:
+        """
+        Returns a tokenizer running the UTF-8 encoding of this automaton over bytes,
+        see encodeAutomaton, only meant to scan bytes-like data. It is built once,
+        then cached
+        """
+        if self.encoded is None:
+            self.encoded = Tokenizer(
+                encodeAutomaton(self.nodes),
+                eof=self.eof,
+                skipped=self.skipped,
+                keywords=self.keywords,
+            )
 
-        if len(buffer.getvalue()) == 0 and flow.hasMore():
-            buffer.write(chr(flow.peek()))
-        raise Exception(
-            "Unable to parse '\x1b[1;31m{}\x1b[0m' at line {}, column {}".format(
-                buffer.getvalue(), line, column
+        self.encoded.skipper = self.skipper
+        return self.encoded
+
+    def save(self, path: str):
+        """
+        Saves the tokenizer in a compact binary format, see
+        gammaparsing4py.tokenizer.storage: its table is saved as arrays, and its keys
+        by name, see keyName, the end of data key being the only one allowed to have
+        no name. The skipper and the re backend aren't saved
+        """
+        names = [keyName(key) for key in self.keys]
+        if None in names[1:] or len(set(names[1:])) != len(names) - 1:
+            raise Exception(
+                "Only tokenizers whose keys have distinct names can be saved"
             )
+
+        table = self.table
+        header = {
+            "keys": names,
+            "skipped": sorted(
+                self.keyIds[key] for key in self.skipped if key in self.keyIds
+            ),
+            "keywords": [
+                [
+                    self.keyIds[key],
+                    [[text, self.keyIds[value]] for text, value in texts.items()],
+                ]
+                for key, texts in self.keywords.items()
+            ],
+            "numClasses": table.numClasses,
+            "limit": table.limit,
+        }
+
+        writeTokenizerFile(path, header, table.arrays())
+
+    def load(
+        path: str,
+        terminals: dict[str, T] = None,
+        eof: T = None,
+        skipper: Callable[[Token[T]], bool] = keepAll,
+    ) -> Tokenizer[T]:
+        """
+        Loads a tokenizer saved by save. Keys are looked up by name in terminals, the
+        names being the keys themselves if it isn't given. The end of data key is eof
+        if it is given
+        """
+        header, arrays = readTokenizerFile(path)
+
+        names = header["keys"]
+        keys: list[T] = [
+            name if terminals is None else terminals[name] for name in names[1:]
+        ]
+        if eof is None and names[0] is not None:
+            eof = names[0] if terminals is None else terminals[names[0]]
+        keys.insert(0, eof)
+
+        table = TokenizerTable(header["numClasses"], header["limit"], *arrays)
+        if max(table.accepts, default=-1) >= len(keys):
+            raise Exception("Tokenizer file '{}' is inconsistent".format(path))
+
+        # The nodes are only rebuilt from the table if they are needed
+        return Tokenizer(
+            None,
+            eof=eof,
+            skipper=skipper,
+            skipped={keys[keyId] for keyId in header["skipped"]},
+            keywords={
+                keys[keyId]: {text: keys[value] for text, value in texts}
+                for keyId, texts in header["keywords"]
+            },
+            table=table,
+            keys=keys,
         )
 
-    def nextToken(self, flow: CharFlow) -> Token[T]:
-        result: Token[T] = self.readToken(flow)
 
-        while self.skipper(result):
-            result = self.readToken(flow)
+class LazyTable(TokenizerTable):
+    """
+    Table of an automaton determinized on the fly: states are built from the sets of
+    build nodes they stand for the first time they are reached, and transitions the
+    first time they are taken, -2 denoting transitions not computed yet. Once
+    maxStates states are cached, the whole cache is flushed
+    """
 
-        return result
+    UNKNOWN: int = -2
 
-    def iterator(self, flow: CharFlow):
-        return TokenizerIterator(self, flow)
+    def __init__(
+        self,
+        rootBuildNode: TokenizerBuildNode[T],
+        buildNodes: list[TokenizerBuildNode[T]],
+        keyIds: dict[T, int],
+        discarded: set[int] = set(),
+        maxStates: int = MAX_LAZY_STATES,
+        limit: int = CODE_POINT_LIMIT,
+    ):
+        if maxStates < 2:
+            raise Exception("Lazy tables need room for at least 2 states")
+
+        points, intervalClasses = computeClasses(
+            [
+                [(key, target.id) for key, target in node.transitions]
+                for node in buildNodes
+            ]
+        )
+        numClasses = max(intervalClasses) + 1
+
+        TokenizerTable.__init__(
+            self,
+            numClasses,
+            limit,
+            *buildClassMap(points, intervalClasses, limit),
+            array("i"),
+            array("i"),
+            array("b"),
+            array("b"),
+        )
+
+        # State ids always stay below maxStates, which is used to encode failures
+        self.numStates: int = maxStates
+        self.maxStates: int = maxStates
+
+        self.keyIds: dict[T, int] = keyIds
+        self.discarded: set[int] = discarded
+        self.buildNodes: list[TokenizerBuildNode[T]] = buildNodes
+        self.closures: list[int] = computeEpsilonClosures(buildNodes)
+
+        # A code point of each class, used to compute transitions
+        self.samples: list[int] = [0] * numClasses
+        for point, classId in reversed(list(zip(points, intervalClasses))):
+            self.samples[classId] = point
+
+        self.unknownRow: array[int] = array("i", [LazyTable.UNKNOWN]) * numClasses
+
+        # Sets of build nodes are bitsets of their ids
+        self.root: int = self.closures[rootBuildNode.id]
+        self.sets: list[int] = []
+        self.members: list[list[TokenizerBuildNode[T]]] = []
+        self.ids: dict[int, int] = {}
+
+        self._add(self.root)
+
+    def _add(self, targetSet: int) -> int:
+        members = bitsetMembers(targetSet, self.buildNodes)
+
+        state = len(self.sets)
+        self.sets.append(targetSet)
+        self.members.append(members)
+        self.ids[targetSet] = state
+
+        entry = resolveEntry(members)
+        accept = -1 if entry is None else self.keyIds[entry[0]]
+
+        self.transitions.extend(self.unknownRow)
+        self.accepts.append(accept)
+        self.stops.append(entry is not None and entry[1])
+        self.discards.append(accept in self.discarded)
+
+        return state
+
+    def flush(self):
+        """
+        Drops every cached state, the arrays being emptied in place
+        """
+        self.sets.clear()
+        self.members.clear()
+        self.ids.clear()
+        del self.transitions[:]
+        del self.accepts[:]
+        del self.stops[:]
+        del self.discards[:]
+
+        self.flushes += 1
+        self._add(self.root)
+
+    def expand(self, state: int, classId: int) -> int:
+        """
+        Computes the transition of the given state for the given class. The cache may
+        be flushed in the process, only the returned state id staying valid
+        """
+        code = self.samples[classId]
+
+        targetSet = 0
+        for node in self.members[state]:
+            for key, target in node.transitions:
+                if key.start <= code <= key.end:
+                    targetSet |= self.closures[target.id]
+
+        if targetSet == 0:
+            self.transitions[state * self.numClasses + classId] = -1
+            return -1
+
+        target = self.ids.get(targetSet)
+
+        if target is None:
+            if len(self.sets) >= self.maxStates:
+                self.flush()
+                if targetSet == self.root:
+                    return 0
+                return self._add(targetSet)
+
+            target = self._add(targetSet)
+
+        self.transitions[state * self.numClasses + classId] = target
+        return target
+
+    def step(self, state: int, classId: int) -> int:
+        target = self.transitions[state * self.numClasses + classId]
+
+        if target == LazyTable.UNKNOWN:
+            return self.expand(state, classId)
+        return target
+
+
+class LazyTokenizer(Tokenizer[T]):
+    """
+    Tokenizer keeping the non-deterministic automaton, its deterministic states being
+    built as they are reached by the input, see LazyTable. Building it is immediate
+    and its memory is bounded by the size of the state cache. Conflicts between
+    patterns are only detected when they are reached
+    """
+
+    def __init__(
+        self,
+        rootBuildNode: TokenizerBuildNode[T],
+        buildNodes: list[TokenizerBuildNode[T]],
+        eof: T = None,
+        skipper: Callable[[Token[T]], bool] = keepAll,
+        skipped: set[T] = set(),
+        maxStates: int = MAX_LAZY_STATES,
+        keywords: dict[T, dict[str, T]] = {},
+    ):
+        self._nodes: list[TokenizerNode[T]] = None
+        self.eof: T = eof
+        self.skipper: Callable[[Token[T]], bool] = skipper
+        self.skipped: set[T] = set(skipped)
+
+        self.keys: list[T] = [eof]
+        self.keyIds: dict[T, int] = {eof: 0}
+        for node in buildNodes:
+            if node.entry is not None and node.entry[0] not in self.keyIds:
+                self.keyIds[node.entry[0]] = len(self.keys)
+                self.keys.append(node.entry[0])
+        self._addKeywords(keywords)
+        self.discarded: set[int] = {
+            self.keyIds[key] for key in self.skipped if key in self.keyIds
+        }
+
+        self.rootBuildNode: TokenizerBuildNode[T] = rootBuildNode
+        self.buildNodes: list[TokenizerBuildNode[T]] = buildNodes
+        self.table: LazyTable = LazyTable(
+            rootBuildNode,
+            buildNodes,
+            self.keyIds,
+            self.discarded,
+            maxStates,
+        )
+
+        self.matcher: Callable[[str, int, int, FailureMemo], tuple[int, int]] = None
+        self.native: NativeScanner[T] = None
+        self.encoded: Tokenizer[T] = None
+
+    @property
+    def nodes(self) -> list[TokenizerNode[T]]:
+        """
+        Lazy tokenizers only keep their build nodes
+        """
+        return None
+
+    def accelerate(self) -> Accelerations:
+        """
+        Loops and chains can't be followed through states computed on the fly
+        """
+        return None
+
+    def compile(self) -> Callable[[str, int, int, FailureMemo], tuple[int, int]]:
+        raise Exception("Lazy tokenizers can't be compiled")
+
+    def compiledIterator(self, text: str) -> Iterator[Token[T]]:
+        """
+        Lazy tokenizers can't be compiled, their tokens are read by iterator
+        """
+        return self.iterator(CharFlow.fromString(text))
+
+    def utf8(self) -> Tokenizer[T]:
+        """
+        Returns a lazy tokenizer running the UTF-8 encoding of this automaton over
+        bytes, see encodeBuildNodes. It is built once, then cached
+        """
+        if self.encoded is None:
+            self.encoded = LazyTokenizer(
+                *encodeBuildNodes(self.rootBuildNode, self.buildNodes),
+                eof=self.eof,
+                skipped=self.skipped,
+                maxStates=self.table.maxStates,
+                keywords=self.keywords,
+            )
+
+        self.encoded.skipper = self.skipper
+        return self.encoded
+
+    def tokenizeParallel(
+        self,
+        text: str,
+        workers: int = None,
+        chunkSize: int = PARALLEL_CHUNK_SIZE,
+        separator: str = None,
+        context: BaseContext = None,
+    ) -> TokenBuffer[T]:
+        """
+        Lazy tokenizers have no table to send to worker processes, their tokens are
+        read at once
+        """
+        return self.tokenizeAll(text)
+
+    def save(self, path: str):
+        raise Exception("Lazy tokenizers can't be saved")
 
 
 class TokenizerIterator(Iterator[Token[T]]):
@@ -476,13 +1848,53 @@ class TokenizerIterator(Iterator[Token[T]]):
         self.tokenizer: Tokenizer[T] = tokenizer
         self.flow: CharFlow = flow
 
+        self.failures: FailureMemo = FailureMemo(tokenizer.table)
+        self.classes: FlowClasses = FlowClasses(
+            flow, tokenizer.table, self.failures, tokenizer.accelerate(), True
+        )
         self.hasReachedEOF: bool = False
 
     def __next__(self):
         if self.hasReachedEOF:
             raise StopIteration()
 
-        token = self.tokenizer.nextToken(self.flow)
+        token = self.tokenizer.nextToken(self.flow, self.failures, self.classes)
+        if token.key == self.tokenizer.eof:
+            self.hasReachedEOF = True
+        return token
+
+
+class AsyncTokenizerIterator(AsyncIterator[Token[T]]):
+    """
+    Async iterator over the tokens of an AsyncCharFlow. Tokens are scanned over the
+    data received so far, scanning being resumed where it stopped once more data is
+    received, so that tokens spanning several chunks are read as if the data was
+    received at once
+    """
+
+    def __init__(self, tokenizer: Tokenizer[T], flow: AsyncCharFlow):
+        self.tokenizer: Tokenizer[T] = tokenizer
+        self.flow: AsyncCharFlow = flow
+
+        self.failures: FailureMemo = FailureMemo(tokenizer.table)
+        self.classes: FlowClasses = FlowClasses(
+            flow, tokenizer.table, self.failures, tokenizer.accelerate(), True
+        )
+        self.hasReachedEOF: bool = False
+
+    async def __anext__(self):
+        if self.hasReachedEOF:
+            raise StopAsyncIteration()
+
+        flow = self.flow
+        while True:
+            flow.starved = False
+            token = self.tokenizer.nextToken(flow, self.failures, self.classes)
+            if token is not None and not flow.starved:
+                break
+
+            await flow.receive()
+
         if token.key == self.tokenizer.eof:
             self.hasReachedEOF = True
         return token
@@ -0,0 +1,64 @@
+"""Translation of code point ranges into UTF-8 byte sequences"""
+
+from gammaparsing4py.tokenizer.regex import MAX_CODE_POINT
+
+# Highest code point encoded by each sequence length
+ENCODING_LIMITS = [0x7F, 0x7FF, 0xFFFF]
+
+SURROGATES_START = 0xD800
+SURROGATES_END = 0xDFFF
+
+
+def utf8Sequences(start: int, end: int) -> list[list[tuple[int, int]]]:
+    """
+    Returns the byte sequences encoding the code points from start to end, each
+    given as a list of byte ranges, in increasing order
+    """
+    result: list[list[tuple[int, int]]] = []
+    stack: list[tuple[int, int]] = [(start, min(end, MAX_CODE_POINT))]
+
+    while stack:
+        start, end = stack.pop()
+        if start > end:
+            continue
+
+        # Splitting around surrogates
+        if start <= SURROGATES_END and end >= SURROGATES_START:
+            stack.append((SURROGATES_END + 1, end))
+            stack.append((start, SURROGATES_START - 1))
+            continue
+
+        # Splitting by sequence length
+        split = False
+        for limit in ENCODING_LIMITS:
+            if start <= limit < end:
+                stack.append((limit + 1, end))
+                stack.append((start, limit))
+                split = True
+                break
+        if split:
+            continue
+
+        # Splitting until continuation bytes cover their whole range
+        for index in range(1, 4):
+            mask = (1 << (6 * index)) - 1
+            if start & ~mask == end & ~mask:
+                continue
+
+            if start & mask != 0:
+                stack.append(((start | mask) + 1, end))
+                stack.append((start, start | mask))
+                split = True
+                break
+
+            if end & mask != mask:
+                stack.append((end & ~mask, end))
+                stack.append((start, (end & ~mask) - 1))
+                split = True
+                break
+        if split:
+            continue
+
+        result.append(list(zip(chr(start).encode("utf-8"), chr(end).encode("utf-8"))))
+
+    return result
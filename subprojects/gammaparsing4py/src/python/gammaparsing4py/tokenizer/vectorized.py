@@ -0,0 +1,61 @@
+"""Optional NumPy computations for bulk tokenization"""
+
+from array import array
+
+from gammaparsing4py.tokenizer.table import PAGE_BITS, PAGE_MASK, TokenizerTable
+
+# NumPy isn't a dependency
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def codePoints(text: str):
+    return numpy.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+
+def classIds(table: TokenizerTable, text: str):
+    """
+    Returns the class id of each character of text, as bytes if every id fits in a
+    byte, as a list otherwise
+    """
+    codes = codePoints(text)
+    pageIndex = numpy.frombuffer(table.pageIndex, dtype=numpy.intc)
+    pageData = numpy.frombuffer(table.pageData, dtype=numpy.intc)
+
+    low = numpy.minimum(codes, table.limit - 1)
+    classes = pageData[pageIndex[low >> PAGE_BITS] + (low & PAGE_MASK)]
+
+    # Code points above the page table
+    high = codes >= table.limit
+    if high.any():
+        highStarts = numpy.frombuffer(table.highStarts, dtype=numpy.intc)
+        highClasses = numpy.frombuffer(table.highClasses, dtype=numpy.intc)
+        classes[high] = highClasses[
+            numpy.searchsorted(highStarts, codes[high], side="right") - 1
+        ]
+
+    if table.numClasses <= 0x100:
+        return classes.astype(numpy.uint8).tobytes()
+    return classes.tolist()
+
+
+def linePositions(text: str, offsets: array) -> tuple[list[int], list[int]]:
+    """
+    Returns the line and column numbers of the given offsets of text, offsets being
+    given as an array of 64 bits ints
+    """
+    codes = codePoints(text)
+    newlines = codes == 0x0A
+
+    # Number of newlines before each offset, and offset of the last one (or -1)
+    counts = numpy.zeros(len(codes) + 1, dtype=numpy.int64)
+    numpy.cumsum(newlines, out=counts[1:])
+    lasts = numpy.full(len(codes) + 1, -1, dtype=numpy.int64)
+    lasts[1:] = numpy.maximum.accumulate(
+        numpy.where(newlines, numpy.arange(len(codes)), -1)
+    )
+
+    points = numpy.frombuffer(offsets, dtype=numpy.int64)
+    return counts[points].tolist(), (points - lasts[points] - 1).tolist()
@@ -1,6 +1,10 @@
+from io import StringIO
+import os
+import tempfile
 from unittest import TestCase
 
-from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.core.charflow import BufferedCharFlow, CharFlow, MappedCharFlow
+from gammaparsing4py.core.positions import LineIndex
 
 
 class Test_CharFlow(TestCase):
@@ -39,3 +43,92 @@ class Test_CharFlow(TestCase):
         flow.next()
 
         self.assertFalse(flow.hasMore())
+
+    def test_buffered(self):
+        flow: CharFlow = BufferedCharFlow(StringIO("ab\ncdefgh"), blockSize=3)
+        flow.mark()
+
+        self.assertTrue(flow.check(ord("a")))
+        flow.read(ord("b"))
+        flow.read(10)
+        self.assertEqual(flow.line, 1)
+        self.assertEqual(flow.column, 0)
+
+        self.assertEqual(flow.next(), ord("c"))
+        self.assertEqual(flow.next(), ord("d"))
+        flow.push(ord("d"))
+        flow.push(ord("c"))
+        flow.push(ord("x"))
+        self.assertEqual(flow.offset, 2)
+        self.assertEqual((flow.line, flow.column), (0, 2))
+
+        self.assertEqual(flow.next(), ord("x"))
+        self.assertEqual(flow.next(), ord("c"))
+        self.assertEqual((flow.line, flow.column), (1, 1))
+        self.assertEqual(flow.next(), ord("d"))
+        self.assertEqual(flow.slice(0, 5), "ab\ncd")
+
+        for c in "efgh":
+            flow.read(ord(c))
+
+        self.assertFalse(flow.hasMore())
+        self.assertEqual(flow.peek(), -1)
+
+    def test_pushback(self):
+        flow: CharFlow = CharFlow(StringIO("abc"))
+
+        self.assertEqual(flow.next(), ord("a"))
+        self.assertEqual(flow.peek(), ord("b"))
+        flow.push(ord("a"))
+        flow.push(ord("z"))
+
+        self.assertEqual(flow.next(), ord("z"))
+        self.assertEqual(flow.next(), ord("a"))
+        self.assertEqual(flow.next(), ord("b"))
+        self.assertEqual(flow.next(), ord("c"))
+        self.assertFalse(flow.hasMore())
+
+    def test_positions(self):
+        data = "ab\ncd\n\nefg"
+        expected = [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (3, 0)]
+
+        index = LineIndex(data)
+        self.assertEqual(list(map(index.position, range(8))), expected)
+
+        for flow in [
+            CharFlow.fromString(data),
+            BufferedCharFlow(StringIO(data), blockSize=2),
+            CharFlow(StringIO(data)),
+        ]:
+            for line, column in expected:
+                self.assertEqual((flow.line, flow.column), (line, column))
+                flow.next()
+
+    def test_mapped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("a\u00E9\nb")
+
+            flow = CharFlow.fromFile(path)
+            self.assertIsInstance(flow, MappedCharFlow)
+            self.assertEqual(flow.encoding, "utf-8")
+
+            self.assertTrue(flow.check(ord("a")))
+            start = flow.mark()
+            self.assertEqual(flow.next(), 0xC3)
+            self.assertEqual(flow.next(), 0xA9)
+            self.assertEqual(flow.slice(start, flow.offset), "\u00E9".encode("utf-8"))
+
+            flow.read(10)
+            self.assertEqual((flow.line, flow.column), (1, 0))
+            flow.rewind(start)
+            self.assertEqual(flow.offset, 1)
+
+            flow.next()
+            flow.push(0xC3)
+            self.assertEqual(flow.peek(), 0xC3)
+
+            empty = os.path.join(directory, "empty.txt")
+            open(empty, "w").close()
+            self.assertFalse(CharFlow.fromFile(empty).hasMore())
@@ -0,0 +1,33 @@
+import pickle
+from unittest import TestCase
+
+from gammaparsing4py.core.positions import LineIndex
+from gammaparsing4py.core.token import Token, TokenBuffer
+
+
+class Test_Token(TestCase):
+
+    def test_lazy_token(self):
+        source = "first\nsecond"
+        token = Token("id", None, None, None, 6, 12, source, LineIndex(source))
+
+        self.assertEqual(token.data, "second")
+        self.assertEqual((token.line, token.column), (1, 0))
+        self.assertFalse(hasattr(token, "__dict__"))
+
+    def test_token_buffer(self):
+        source = "a bc"
+        buffer = TokenBuffer(["eof", "id"], source, LineIndex(source))
+        buffer.append(1, 0, 1)
+        buffer.append(1, 2, 4)
+        buffer.append(0, 4, 4)
+
+        buffer = pickle.loads(pickle.dumps(buffer))
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.key(1), "id")
+        self.assertEqual(buffer.data(1), "bc")
+        self.assertEqual(
+            [(token.key, token.data, token.column) for token in buffer],
+            [("id", "a", 0), ("id", "bc", 2), ("eof", None, 4)],
+        )
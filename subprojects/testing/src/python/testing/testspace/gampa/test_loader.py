@@ -132,4 +132,8 @@ class Test_Loader(TestCase):
             parser.reducer = reducer
 
             data = "A + B * C + D"
-            result = parser.parse(tokenizer.iterator(CharFlow.fromString(data)))
\ No newline at end of file
+            result = parser.parse(tokenizer.iterator(CharFlow.fromString(data)))
+
+            # Branching actions go on from the tokens of the buffer
+            self.assertIsNotNone(result)
+            self.assertEqual(parser.parse(tokenizer.tokenizeAll(data)), result)
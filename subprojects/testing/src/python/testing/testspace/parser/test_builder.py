@@ -1,6 +1,7 @@
+import asyncio
 from unittest import TestCase
 
-from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.core.charflow import AsyncCharFlow, CharFlow
 from gammaparsing4py.parser.builder import ParserBuilder, Rule
 from gammaparsing4py.parser.symbols import AbstractTerminal, SpecialTerminal
 from gammaparsing4py.tokenizer.tokenizer import TokenizerBuilder
@@ -52,4 +53,56 @@ class Test_Builder(TestCase):
 
         data = "A + B + C * D * 2"
 
-        result = parser.parse(tokenizer.iterator(CharFlow.fromString(data)))
\ No newline at end of file
+        result = parser.parse(tokenizer.iterator(CharFlow.fromString(data)))
+
+        # Token buffers are parsed by columns
+        self.assertIsNotNone(result)
+        self.assertEqual(parser.parse(tokenizer.tokenizeAll(data)), result)
+
+    def test_build_async(self):
+        parserBuilder = ParserBuilder()
+
+        parserBuilder.addRawRule("S", "E")
+        parserBuilder.addRawRule("E", "(E '+')? T", "biop-+")
+        parserBuilder.addRawRule("T", "(T '*')? F", "biop-*")
+        parserBuilder.addRawRule("F", "'id'", "var")
+        parserBuilder.addRawRule("F", "'(' E ')'", "paren")
+
+        def reducer(rule: Rule, data: list):
+            if rule.name == "paren":
+                return data[1]
+            if rule.name.startswith("biop"):
+                if len(data) == 1:
+                    return data[0]
+                return ("biop", data[1].data, data[0], data[2])
+            return (rule.name, data[0].data)
+
+        tokenizerBuilder = TokenizerBuilder[AbstractTerminal]()
+        tokenizerBuilder.addRawPattern(r"\+", parserBuilder.getTerminal("+"))
+        tokenizerBuilder.addRawPattern(r"\*", parserBuilder.getTerminal("*"))
+        tokenizerBuilder.addRawPattern(
+            r"[a-zA-Z][0-9a-zA-Z]*", parserBuilder.getTerminal("id")
+        )
+        tokenizerBuilder.addRawPattern(r"\(", parserBuilder.getTerminal("("))
+        tokenizerBuilder.addRawPattern(r"\)", parserBuilder.getTerminal(")"))
+        tokenizerBuilder.addRawPattern(r"\s+", parserBuilder.getTerminal("blank"))
+
+        parser = parserBuilder.build(parserBuilder.getNonTerminal("S"))
+        parser.reducer = reducer
+
+        tokenizer = tokenizerBuilder.build(SpecialTerminal.EOF())
+        tokenizer.skipper = lambda token: token.key.id is None
+
+        data = "alpha + (beta + gamma) * delta2"
+        expected = parser.parse(tokenizer.iterator(CharFlow.fromString(data)))
+
+        async def parse():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data.encode())
+            reader.feed_eof()
+
+            flow = AsyncCharFlow(reader, blockSize=3)
+            return await parser.parseAsync(tokenizer.asyncIterator(flow))
+
+        self.assertIsNotNone(expected)
+        self.assertEqual(asyncio.run(parse()), expected)
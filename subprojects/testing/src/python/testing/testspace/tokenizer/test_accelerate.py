@@ -0,0 +1,72 @@
+from array import array
+from unittest import TestCase
+
+from gammaparsing4py.tokenizer.table import TokenizerTable
+from gammaparsing4py.tokenizer.tokenizer import TokenizerBuilder
+
+
+class Test_Accelerate(TestCase):
+
+    def test_accelerations(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"abc\.def", "qualified", above={"id"})
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"/\*([^*]|\*+[^*/])*\*+/", "comment")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+        accelerations = tokenizer.accelerate()
+
+        self.assertTrue(any(loop is not None for loop in accelerations.loops))
+        self.assertEqual(
+            [chain[0].__self__.pattern for chain in accelerations.chains if chain],
+            ["\\x64\\x65\\x66", "\\x65\\x66"],
+        )
+
+        plain = builder.build("eof", skipped={"blank"})
+        for automaton in [plain, plain.utf8()]:
+            flags = automaton.accelerate().flags
+            automaton.accelerate().flags = array("b", bytes(len(flags)))
+
+        data = "abc.def abc.de /* é ** \n*/ abc  /**/ abc.d"
+        for text in [data, data[:-2], data[:26] + " abc.def\t"]:
+            for tokenize in [
+                lambda automaton: automaton.tokenizeAll(text),
+                lambda automaton: automaton.tokenizeBytes(text.encode()),
+            ]:
+                self.assertEqual(
+                    [(token.key, token.start, token.end) for token in tokenize(plain)],
+                    [
+                        (token.key, token.start, token.end)
+                        for token in tokenize(tokenizer)
+                    ],
+                )
+
+    def test_accelerations_failures(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"a", "a")
+        builder.addRawPattern(r"a*b", "ab")
+
+        tokenizer = builder.build("eof")
+        table = tokenizer.table
+
+        # Steps replayed by the failure memo stay linear in the length of the data
+        steps = [0]
+
+        def step(state: int, classId: int) -> int:
+            steps[0] += 1
+            return TokenizerTable.step(table, state, classId)
+
+        table.step = step
+
+        for data in ["a" * 2000, b"a" * 2000]:
+            steps[0] = 0
+            buffer = (
+                tokenizer.tokenizeAll(data)
+                if isinstance(data, str)
+                else tokenizer.tokenizeBytes(data)
+            )
+
+            self.assertEqual(list(buffer.ids), [1] * 2000 + [0])
+            self.assertLess(steps[0], 3 * len(data))
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.tokenizer.codegen import generateSource
+from gammaparsing4py.tokenizer.tokenizer import Tokenizer, TokenizerBuilder
+
+
+class Test_Codegen(TestCase):
+
+    def buildTokenizer(self) -> Tokenizer[str]:
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"\p{Alpha}\w*", "id")
+        builder.addRawPattern(r"or", "or", above={"id"})
+        builder.addRawPattern(r"[0-9]+", "number")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"\+|\*|-|/|>|<|>=|<=|!=|==", "operator")
+        builder.addRawPattern(r"[Ѐ-ӿ]+", "cyrillic")
+        builder.addRawPattern(r"(//|#)[^\n]*\n", "comment", reluctant=True)
+        builder.addRawPattern(r"/\*.**/", "comment-multiline", reluctant=True)
+
+        tokenizer = builder.build("eof")
+        tokenizer.skipper = lambda token: token.key == "blank"
+        return tokenizer
+
+    def test_source(self):
+        tokenizer = self.buildTokenizer()
+        source = generateSource(
+            [node.getTransitions() for node in tokenizer.nodes], tokenizer.table
+        )
+
+        self.assertTrue(
+            source.startswith("def match(text, position, length, failures):")
+        )
+        self.assertIs(tokenizer.compile(), tokenizer.compile())
+
+    def test_same_stream(self):
+        tokenizer = self.buildTokenizer()
+
+        def describe(tokens):
+            return [
+                (token.key, token.data, token.start, token.line, token.column)
+                for token in tokens
+            ]
+
+        for data in [
+            "",
+            "var1 + var2 * var3 / var4 or test",
+            "a >= 12 // comment\n  /* multi \n line */ b != мир orb",
+        ]:
+            self.assertEqual(
+                describe(tokenizer.compiledIterator(data)),
+                describe(tokenizer.iterator(CharFlow.fromString(data))),
+            )
+
+        for data in ["a ( b", "x == y # unterminated"]:
+            with self.assertRaises(Exception):
+                list(tokenizer.iterator(CharFlow.fromString(data)))
+            with self.assertRaises(Exception):
+                list(tokenizer.compiledIterator(data))
@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.tokenizer.glushkov import PositionSets
+from gammaparsing4py.tokenizer.regex import parseRegex
+from gammaparsing4py.tokenizer.tokenizer import (
+    TokenizerBuilder,
+    buildAutomaton,
+    buildPositionAutomaton,
+)
+
+
+class Test_Glushkov(TestCase):
+
+    def test_positions(self):
+        positions = PositionSets.of(parseRegex(CharFlow.fromString(r"(a|b)*c?d")))
+
+        def chars(targets):
+            return "".join(sorted(chr(positions.ranges[p][0].start) for p in targets))
+
+        self.assertEqual(len(positions.ranges), 4)
+        self.assertFalse(positions.nullable)
+        self.assertEqual(chars(positions.first), "abcd")
+        self.assertEqual(chars(positions.last), "d")
+        self.assertEqual(
+            {
+                chars([position]): chars(frozenset().union(*following))
+                for position, following in enumerate(positions.follow)
+            },
+            {"a": "abcd", "b": "abcd", "c": "d", "d": ""},
+        )
+
+        self.assertTrue(PositionSets.of(parseRegex(CharFlow.fromString("a*"))).nullable)
+
+    def test_position_automaton(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"if", "if", above={"id"})
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"\s+", "blank")
+
+        _, positionNodes = buildPositionAutomaton(builder.entries)
+        _, thompsonNodes = buildAutomaton(builder.entries)
+        self.assertLess(len(positionNodes), len(thompsonNodes))
+        self.assertTrue(all(not node.epsilonTransitions for node in positionNodes))
+
+        thompson = builder.build("eof", skipped={"blank"})
+        glushkov = builder.build("eof", skipped={"blank"}, glushkov=True)
+        self.assertEqual(len(glushkov.nodes), len(thompson.nodes))
+
+        data = "if iffy 1.x 2.5 if."
+        self.assertEqual(
+            [
+                (token.key, token.data)
+                for token in glushkov.iterator(CharFlow.fromString(data))
+            ],
+            [
+                (token.key, token.data)
+                for token in thompson.iterator(CharFlow.fromString(data))
+            ],
+        )
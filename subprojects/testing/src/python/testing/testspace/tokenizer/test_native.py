@@ -0,0 +1,86 @@
+import re
+from unittest import TestCase
+
+from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.tokenizer.native import greedySource, shortestSource
+from gammaparsing4py.tokenizer.tokenizer import (
+    TokenizerBuilder,
+    buildAutomaton,
+    determinize,
+    minimize,
+)
+
+
+class Test_Native(TestCase):
+
+    def patternNodes(self, pattern: str, reluctant: bool = False):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(pattern, "value", reluctant)
+        return minimize(determinize(*buildAutomaton(builder.entries)))
+
+    def test_sources(self):
+        number = re.compile(greedySource(self.patternNodes(r"[0-9]+\.?[0-9]*")))
+        self.assertEqual(number.match("12.5x").group(), "12.5")
+        self.assertEqual(number.match("12x").group(), "12")
+
+        self.assertIsNone(greedySource(self.patternNodes(r"(ab)+")))
+
+        comment = re.compile(shortestSource(self.patternNodes(r"/\*.*\*/", True)))
+        self.assertEqual(comment.match("/* a */ b */").group(), "/* a */")
+        self.assertEqual(comment.match("/***/*/").group(), "/***/")
+
+    def test_same_stream(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"\p{Alpha}\w*", "id")
+        builder.addRawPattern(r"or", "or", above={"id"})
+        builder.addRawPattern(r"[0-9]+\.?[0-9]*", "number")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"\+|\*|-|/|>|<|>=|<=|!=|==", "operator")
+        builder.addRawPattern(r"(//|#)[^\n]*\n", "comment", reluctant=True)
+        builder.addRawPattern(r"/\*.*\*/", "comment-multiline", reluctant=True)
+
+        tokenizer = builder.build("eof", native=True)
+        tokenizer.skipper = lambda token: token.key == "blank"
+        self.assertIsNotNone(tokenizer.native)
+
+        def describe(tokens):
+            return [(token.key, token.data, token.start) for token in tokens]
+
+        for data in [
+            "",
+            "var1 + var2 * 3.5 / var4 or test",
+            "a >= 12. // comment\n  /* multi * / \n line **/ b != or orb",
+        ]:
+            self.assertEqual(
+                describe(tokenizer.nativeIterator(data)),
+                describe(tokenizer.iterator(CharFlow.fromString(data))),
+            )
+
+        with self.assertRaises(Exception):
+            list(tokenizer.nativeIterator("a ( b"))
+
+    def test_fallback(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"(ab)+", "repeated")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", native=True)
+        self.assertIsNone(tokenizer.native)
+        self.assertEqual(
+            [token.data for token in tokenizer.nativeIterator("abab ab")],
+            ["abab", " ", "ab", None],
+        )
+
+    def test_shadowed(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"if", "kw", above={"id"})
+        builder.addRawPattern(r"if", "kw2", above={"kw", "id"})
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", native=True)
+        self.assertIsNotNone(tokenizer.native)
+        self.assertEqual(
+            [token.key for token in tokenizer.nativeIterator("if iff")],
+            ["kw2", "blank", "id", "eof"],
+        )
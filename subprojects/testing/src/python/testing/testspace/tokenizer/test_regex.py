@@ -2,6 +2,8 @@ from unittest import TestCase
 
 from gammaparsing4py.core.charflow import CharFlow
 from gammaparsing4py.tokenizer.regex import (
+    MAX_CODE_POINT,
+    RegexClass,
     RegexRange,
     parseRegex,
 )
@@ -79,10 +81,19 @@ class Test_RegexRange(TestCase):
                 RegexRange(0, 0),
                 RegexRange(11, 14),
                 RegexRange(29, 31),
-                RegexRange(36, 0xFFFF),
+                RegexRange(36, MAX_CODE_POINT),
             ],
         )
 
+    def test_full_range(self):
+        self.assertEqual(
+            parseRegex(CharFlow.fromString(".")).ranges,
+            [RegexRange(0, MAX_CODE_POINT)],
+        )
+
+        inverted: RegexClass = parseRegex(CharFlow.fromString("[^a]"))
+        self.assertEqual(inverted.ranges[-1], RegexRange(ord("a") + 1, MAX_CODE_POINT))
+
     def test_list_disjoint_valued(self):
         target: list[tuple[RegexRange, str]] = [
             (RegexRange(2, 15), {"A", "B", "C"}),
@@ -0,0 +1,136 @@
+from bisect import bisect_right
+from unittest import TestCase
+
+from gammaparsing4py.tokenizer.regex import RegexRange
+from gammaparsing4py.tokenizer.table import (
+    CODE_POINT_LIMIT,
+    PAGE_BITS,
+    PAGE_MASK,
+    TokenizerTable,
+    buildClassMap,
+    computeClasses,
+)
+from gammaparsing4py.tokenizer.tokenizer import TokenizerBuilder
+
+
+class Test_TokenizerTable(TestCase):
+
+    def test_classes(self):
+        points, classes = computeClasses(
+            [
+                [
+                    (RegexRange(ord("a"), ord("z")), 1),
+                    (RegexRange(ord("0"), ord("9")), 2),
+                ],
+                [
+                    (RegexRange(ord("a"), ord("f")), 1),
+                    (RegexRange(ord("0"), ord("9")), 1),
+                ],
+            ]
+        )
+
+        def classOf(code: int):
+            for index in reversed(range(len(points))):
+                if points[index] <= code:
+                    return classes[index]
+
+        self.assertEqual(classOf(ord("a")), classOf(ord("f")))
+        self.assertNotEqual(classOf(ord("f")), classOf(ord("g")))
+        self.assertEqual(classOf(ord("g")), classOf(ord("z")))
+        self.assertEqual(classOf(ord("!")), 0)
+        self.assertEqual(classOf(0x10000), 0)
+        self.assertEqual(len(set(classes)), 4)
+
+    def test_table(self):
+        table = TokenizerTable.of(
+            [
+                [
+                    (RegexRange(ord("a"), ord("z")), 1),
+                    (RegexRange(0x1F600, 0x1F64F), 1),
+                ],
+                [(RegexRange(ord("a"), ord("z")), 1)],
+            ],
+            [None, (1, False)],
+        )
+
+        self.assertEqual(table.numClasses, 3)
+        self.assertEqual(table.next(0, ord("q")), 1)
+        self.assertEqual(table.next(1, ord("q")), 1)
+        self.assertEqual(table.next(1, 0x1F600), -1)
+        self.assertEqual(table.next(0, 0x1F600), 1)
+        self.assertEqual(table.next(0, 0x1F650), -1)
+        self.assertEqual(table.next(0, 0x4E00), -1)
+        self.assertEqual(list(table.accepts), [-1, 1])
+
+    def test_class_map(self):
+        points = [0, 0x41, 0x5B, 0x3000, 0x30FF, 0x1F600, 0x1F650, 0x10FFFF]
+        intervalClasses = [0, 1, 0, 2, 0, 3, 0, 4]
+
+        pageIndex, pageData, _, _ = buildClassMap(
+            points, intervalClasses, CODE_POINT_LIMIT
+        )
+
+        self.assertEqual(len(pageIndex), CODE_POINT_LIMIT >> PAGE_BITS)
+        self.assertLess(len(pageData), 8 << PAGE_BITS)
+
+        for code in [0, 0x40, 0x41, 0x5A, 0x5B, 0x2FFF, 0x3000, 0x30FE, 0x30FF, 0xFFFF]:
+            self.assertEqual(
+                pageData[pageIndex[code >> PAGE_BITS] + (code & PAGE_MASK)],
+                intervalClasses[bisect_right(points, code) - 1],
+            )
+        for code in [0x10000, 0x1F5FF, 0x1F600, 0x1F64F, 0x1F650, 0x10FFFE, 0x10FFFF]:
+            self.assertEqual(
+                pageData[pageIndex[code >> PAGE_BITS] + (code & PAGE_MASK)],
+                intervalClasses[bisect_right(points, code) - 1],
+            )
+
+    def test_tokenizer_table(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"\p{Alpha}\w*", "id")
+        builder.addRawPattern(r"if", "if", above={"id"})
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof")
+        table = tokenizer.table
+
+        self.assertEqual(table.numStates, len(tokenizer.nodes))
+        self.assertEqual(table.classOf(ord("x")), table.classOf(ord("Z")))
+        self.assertNotEqual(table.classOf(ord("i")), table.classOf(ord("x")))
+        for node in tokenizer.nodes:
+            for code in [ord("i"), ord("f"), ord("x"), ord("_"), ord("1"), ord(" ")]:
+                target = node.tree.find(code)
+                self.assertEqual(
+                    table.next(node.id, code), target.id if target is not None else -1
+                )
+
+    def test_class_ids(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"\x{1F600}", "smiley")
+
+        table = builder.build("eof").table
+        text = "ab\U0001F600é\U0010FFFF"
+        data = "ab é".encode()
+
+        self.assertEqual(
+            list(table.classIds(text)), [table.classOf(ord(char)) for char in text]
+        )
+        for view in [data, bytearray(data), memoryview(data)]:
+            self.assertEqual(
+                list(table.classIds(view)), [table.classOf(code) for code in data]
+            )
+
+        # Class ids above a byte
+        for code in range(0x100, 0x300):
+            builder.addRawPattern(chr(code), "char{}".format(code))
+
+        table = builder.build("eof").table
+        text = "aĀ˿\U0001F600"
+
+        self.assertGreater(table.numClasses, 0x100)
+        self.assertEqual(
+            list(table.classIds(text)), [table.classOf(ord(char)) for char in text]
+        )
+        self.assertEqual(
+            list(table.classIds(data)), [table.classOf(code) for code in data]
+        )
@@ -1,10 +1,20 @@
+import asyncio
+from io import StringIO
+from multiprocessing import get_context
+import os
+import tempfile
 from unittest import TestCase
 
-from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.core.charflow import AsyncCharFlow, BufferedCharFlow, CharFlow
 from gammaparsing4py.tokenizer.regex import RegexRange
+from gammaparsing4py.tokenizer.table import FailureMemo
 from gammaparsing4py.tokenizer.tokenizer import (
     AVLTree,
+    Tokenizer,
     TokenizerBuilder,
+    bitsetMembers,
+    buildAutomaton,
+    computeEpsilonClosures,
 )
 
 
@@ -49,3 +59,676 @@ class Test_Tokenizer(TestCase):
         iterator = tokenizer.iterator(flow)
         for token in iterator:
             ...
+
+    def test_tokenizer_offsets(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"\p{Alpha}\w*", "id")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"=", "equal")
+
+        tokenizer = builder.build("eof")
+        tokenizer.skipper = lambda token: token.key == "blank"
+
+        data = "alpha = beta\n  gamma"
+        expected = [
+            ("id", "alpha", 0, 5),
+            ("equal", "=", 6, 7),
+            ("id", "beta", 8, 12),
+            ("id", "gamma", 15, 20),
+            ("eof", None, 20, 20),
+        ]
+
+        for flow in [
+            CharFlow.fromString(data),
+            CharFlow(StringIO(data)),
+            BufferedCharFlow(StringIO(data), blockSize=2),
+        ]:
+            tokens = list(tokenizer.iterator(flow))
+            self.assertEqual(
+                [(token.key, token.data, token.start, token.end) for token in tokens],
+                expected,
+            )
+            self.assertEqual(
+                [(token.line, token.column) for token in tokens],
+                [(0, 0), (0, 6), (0, 8), (1, 2), (1, 7)],
+            )
+
+        for flow in [CharFlow.fromString(data), CharFlow(StringIO(data))]:
+            buffer = tokenizer.tokenize(flow)
+            self.assertEqual(
+                [(token.key, token.start, token.end) for token in buffer],
+                [(key, start, end) for key, _, start, end in expected],
+            )
+            self.assertEqual(buffer.data(2), "beta")
+
+    def test_tokenizer_blocks(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"a+b", "ab")
+        builder.addRawPattern(r"a", "a")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof")
+        data = "aaaa aab\naaaaaaab a"
+        expected = [
+            (token.key, token.start, token.end) for token in tokenizer.tokenizeAll(data)
+        ]
+
+        # Matches spanning several blocks, and backing up over them
+        for blockSize in [1, 2, 3, 64]:
+            flow = BufferedCharFlow(StringIO(data), blockSize=blockSize)
+            self.assertEqual(
+                [
+                    (token.key, token.start, token.end)
+                    for token in tokenizer.iterator(flow)
+                ],
+                expected,
+            )
+
+        # Pushed back characters are scanned one at a time
+        flow = BufferedCharFlow(StringIO(" " + data), blockSize=2)
+        flow.read(ord(" "))
+        flow.push(ord("a"))
+        flow.read(ord("a"))
+        flow.push(ord("a"))
+        self.assertEqual(
+            [(token.key, token.start, token.end) for token in tokenizer.iterator(flow)],
+            [("a", 0, 1)] + [(key, start + 1, end + 1) for key, start, end in expected],
+        )
+
+    def test_tokenizer_bulk(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern("[a-z\u00e0-\u00ff\U0001d400-\U0001d4ff]+", "id")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"=", "equal")
+
+        tokenizer = builder.build("eof")
+        tokenizer.skipper = lambda token: token.key == "blank"
+
+        for data in ["alpha = beta\n  gamma", "\u00e9t\u00e9 = \U0001d49c"]:
+            expected = [
+                (token.key, token.data, token.line, token.column)
+                for token in tokenizer.iterator(CharFlow.fromString(data))
+            ]
+            self.assertEqual(
+                [
+                    (token.key, token.data, token.line, token.column)
+                    for token in tokenizer.tokenizeAll(data)
+                ],
+                expected,
+            )
+
+        buffer = tokenizer.tokenizeBytes(b"alpha = beta")
+        self.assertEqual(
+            [(buffer.key(i), buffer.data(i)) for i in range(len(buffer))],
+            [("id", "alpha"), ("equal", "="), ("id", "beta"), ("eof", None)],
+        )
+
+        with self.assertRaises(Exception):
+            tokenizer.tokenizeAll("alpha = 0")
+
+    def test_tokenizer_skipped(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"#[^\n]*\n", "comment", reluctant=True)
+
+        tokenizer = builder.build("eof", native=True, skipped={"blank", "comment"})
+        self.assertEqual(sum(tokenizer.table.discards), 2)
+
+        data = "alpha # comment\n beta  "
+        expected = [("id", "alpha"), ("id", "beta"), ("eof", None)]
+
+        for tokens in [
+            tokenizer.iterator(CharFlow.fromString(data)),
+            tokenizer.iterator(CharFlow(StringIO(data))),
+            tokenizer.compiledIterator(data),
+            tokenizer.nativeIterator(data),
+            tokenizer.tokenizeAll(data),
+        ]:
+            tokens = list(tokens)
+            self.assertEqual([(token.key, token.data) for token in tokens], expected)
+
+    def test_tokenizer_backtracking(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"[a-z]+", "id")
+
+        tokenizer = builder.build("eof")
+
+        data = "1.x2.5."
+        expected = [("number", "1"), ("dot", "."), ("id", "x"), ("number", "2.5")]
+        expected += [("dot", "."), ("eof", None)]
+
+        for flow in [CharFlow.fromString(data), CharFlow(StringIO(data))]:
+            self.assertEqual(
+                [(token.key, token.data) for token in tokenizer.iterator(flow)],
+                expected,
+            )
+
+        self.assertEqual(
+            [(token.key, token.data) for token in tokenizer.compiledIterator(data)],
+            expected,
+        )
+
+        buffer = tokenizer.tokenizeAll(data)
+        self.assertEqual(
+            [(buffer.key(i), buffer.data(i)) for i in range(len(buffer))],
+            expected,
+        )
+
+        # Failures are memoized, every suffix isn't scanned again
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"a", "a")
+        builder.addRawPattern(r"a*b", "ab")
+        tokenizer = builder.build("eof")
+
+        failures = FailureMemo(tokenizer.table)
+        flow = CharFlow.fromString("a" * 1000)
+        for _ in range(1000):
+            self.assertEqual(tokenizer.readToken(flow, failures).key, "a")
+        self.assertEqual(tokenizer.readToken(flow, failures).key, "eof")
+        self.assertLessEqual(len(failures.pairs), 1000)
+
+    def test_tokenizer_lazy(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"if", "if", above={"id"})
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"\s+", "blank")
+
+        eager = builder.build("eof", skipped={"blank"})
+        lazy = builder.buildLazy("eof", skipped={"blank"}, maxStates=3)
+        self.assertEqual(len(lazy.table.sets), 1)
+
+        data = "if iffy 1.x 2.5 if."
+        expected = [
+            (token.key, token.data, token.start)
+            for token in eager.iterator(CharFlow.fromString(data))
+        ]
+
+        for flow in [CharFlow.fromString(data), CharFlow(StringIO(data))]:
+            self.assertEqual(
+                [(token.key, token.data, token.start) for token in lazy.iterator(flow)],
+                expected,
+            )
+
+        self.assertEqual(
+            [(token.key, token.data, token.start) for token in lazy.tokenizeAll(data)],
+            expected,
+        )
+
+        self.assertGreater(lazy.table.flushes, 0)
+        self.assertLessEqual(len(lazy.table.sets), 3)
+
+    def test_tokenizer_closures(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"((a*)*|c)*b", "ab")
+
+        rootNode, buildNodes = buildAutomaton(builder.entries)
+        closures = computeEpsilonClosures(buildNodes)
+
+        # Only the nodes reading a, b or c remain in the closure of the root
+        members = bitsetMembers(closures[rootNode.id], buildNodes)
+        self.assertEqual(
+            sorted(chr(key.start) for node in members for key, _ in node.transitions),
+            ["a", "b", "c"],
+        )
+
+        for node in buildNodes:
+            for target in node.epsilonTransitions:
+                self.assertEqual(closures[target.id] & ~closures[node.id], 0)
+
+    def test_tokenizer_tables(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z\u00E0-\u0101]+", "word")
+        builder.addRawPattern(r"[\u0400-\u04FF]+", "cyrillic")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof")
+        tokenizer.skipper = lambda token: token.key == "blank"
+
+        table = tokenizer.table
+        self.assertGreaterEqual(table.next(0, ord("a")), 0)
+        self.assertGreaterEqual(table.next(0, 0x100), 0)
+        self.assertEqual(table.next(0, 0x102), -1)
+        self.assertEqual(table.next(0, 0x401), table.next(0, 0x4FF))
+
+        self.assertEqual(
+            [
+                (token.key, token.data)
+                for token in tokenizer.iterator(
+                    CharFlow.fromString("\u00E9t\u00E9 \u043C\u0438\u0440")
+                )
+            ],
+            [
+                ("word", "\u00E9t\u00E9"),
+                ("cyrillic", "\u043C\u0438\u0440"),
+                ("eof", None),
+            ],
+        )
+
+    def test_tokenizer_astral(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "word", above={"other"})
+        builder.addRawPattern(r"[\x{1F600}-\x{1F64F}]+", "emoji", above={"other"})
+        builder.addRawPattern(r"\s+", "blank", above={"other"})
+        builder.addRawPattern(r".", "other")
+
+        tokenizer = builder.build("eof", native=True, skipped={"blank"})
+        lazy = builder.buildLazy("eof", skipped={"blank"})
+        self.assertEqual(tokenizer.table.limit, 0x110000)
+
+        data = "hi \U0001F600\U0001F642 \U00020000x \U0010FFFF"
+        expected = [
+            ("word", "hi"),
+            ("emoji", "\U0001F600\U0001F642"),
+            ("other", "\U00020000"),
+            ("word", "x"),
+            ("other", "\U0010FFFF"),
+            ("eof", None),
+        ]
+
+        for tokens in [
+            tokenizer.iterator(CharFlow.fromString(data)),
+            tokenizer.iterator(CharFlow(StringIO(data))),
+            tokenizer.tokenizeAll(data),
+            tokenizer.tokenizeBytes(data.encode()),
+            tokenizer.compiledIterator(data),
+            tokenizer.nativeIterator(data),
+            lazy.tokenizeAll(data),
+            lazy.tokenizeBytes(data.encode()),
+        ]:
+            tokens = list(tokens)
+            self.assertEqual([(token.key, token.data) for token in tokens], expected)
+
+    def test_tokenizer_utf8(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z\u00E0-\u00FF]+", "word")
+        builder.addRawPattern(r"[\u0400-\u04FF]+", "cyrillic")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"[^\sa-z\u00E0-\u00FF\u0400-\u04FF]", "other")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+        encoded = tokenizer.utf8()
+        self.assertIs(tokenizer.utf8(), encoded)
+        self.assertLessEqual(encoded.table.numClasses, 256)
+
+        data = "d\u00E9j\u00E0 \u043C\u0438\u0440\n\U0001F600!"
+        expected = [
+            ("word", "d\u00E9j\u00E0"),
+            ("cyrillic", "\u043C\u0438\u0440"),
+            ("other", "\U0001F600"),
+            ("other", "!"),
+            ("eof", None),
+        ]
+
+        for source in [data.encode(), bytearray(data.encode())]:
+            tokens = list(tokenizer.tokenizeBytes(source))
+            self.assertEqual([(token.key, token.data) for token in tokens], expected)
+            self.assertEqual(
+                [(token.start, token.end) for token in tokens],
+                [(0, 6), (7, 13), (14, 18), (18, 19), (19, 19)],
+            )
+            self.assertEqual((tokens[2].line, tokens[2].column), (1, 0))
+
+        with self.assertRaises(Exception):
+            tokenizer.tokenizeBytes(b"abc \xff")
+
+        # Lazy tokenizers scan UTF-8 data by byte offsets as well
+        lazy = builder.buildLazy("eof", skipped={"blank"}, maxStates=4)
+        self.assertEqual(
+            [
+                (token.key, token.data, token.start, token.end)
+                for token in lazy.tokenizeBytes(data.encode())
+            ],
+            [
+                (token.key, token.data, token.start, token.end)
+                for token in tokenizer.tokenizeBytes(data.encode())
+            ],
+        )
+        self.assertIs(lazy.utf8(), lazy.utf8())
+
+        latin = tokenizer.tokenizeBytes(data[:4].encode("latin-1"), "latin-1")
+        self.assertEqual([token.key for token in latin], ["word", "eof"])
+
+        # Decoded data is tokenized by character offsets
+        wide = tokenizer.tokenizeBytes(data[:8].encode("utf-16-le"), "utf-16-le")
+        self.assertEqual(
+            [(token.key, token.data, token.start, token.end) for token in wide],
+            [
+                ("word", "d\u00E9j\u00E0", 0, 4),
+                ("cyrillic", "\u043C\u0438\u0440", 5, 8),
+                ("eof", None, 8, 8),
+            ],
+        )
+
+    def test_tokenizer_file(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z\u00E0-\u00FF]+", "word")
+        builder.addRawPattern(r"in", "in", above={"word"})
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+        data = "d\u00E9j\u00E0 in\n \u00E9t\u00E9"
+        expected = [
+            ("word", "d\u00E9j\u00E0"),
+            ("in", "in"),
+            ("word", "\u00E9t\u00E9"),
+            ("eof", None),
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input.txt")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(data)
+
+            for tokens in [
+                tokenizer.tokenizeFile(path),
+                tokenizer.iterator(CharFlow.fromFile(path)),
+                tokenizer.tokenize(CharFlow.fromFile(path)),
+            ]:
+                tokens = list(tokens)
+                self.assertEqual(
+                    [(token.key, token.data) for token in tokens], expected
+                )
+                self.assertEqual((tokens[2].start, tokens[2].line), (11, 1))
+
+            with open(path, "ab") as file:
+                file.write(b" \xff")
+            with self.assertRaises(Exception):
+                list(tokenizer.iterator(CharFlow.fromFile(path)))
+
+    def test_tokenizer_async(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z\u00E0-\u00FF]+", "word")
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+
+        data = "d\u00E9j\u00E0 12.5 3.\nx 1234567.89"
+        expected = [
+            (token.key, token.data, token.start, token.line)
+            for token in tokenizer.iterator(CharFlow.fromString(data))
+        ]
+
+        async def chunks(encoded: bytes, size: int):
+            for index in range(0, len(encoded), size):
+                await asyncio.sleep(0)
+                yield encoded[index : index + size]
+
+        async def collect(flow: AsyncCharFlow):
+            return [
+                (token.key, token.data, token.start, token.line)
+                async for token in tokenizer.asyncIterator(flow)
+            ]
+
+        for size in [1, 2, 5, 100]:
+            self.assertEqual(
+                asyncio.run(collect(AsyncCharFlow(chunks(data.encode(), size)))),
+                expected,
+            )
+            self.assertEqual(
+                asyncio.run(collect(AsyncCharFlow(chunks(data, size)))), expected
+            )
+
+        with self.assertRaises(Exception):
+            asyncio.run(collect(AsyncCharFlow(chunks(b"abc ?", 2))))
+
+        # Scanning resumes where it stopped, each character being mapped once
+        mapped = []
+        classIds = tokenizer.table.classIds
+
+        def counted(data):
+            mapped.append(len(data))
+            return classIds(data)
+
+        tokenizer.table.classIds = counted
+
+        data = "1" * 1000 + " x"
+        self.assertEqual(
+            asyncio.run(collect(AsyncCharFlow(chunks(data, 10)))),
+            [
+                ("number", "1" * 1000, 0, 0),
+                ("word", "x", 1001, 0),
+                ("eof", None, 1002, 0),
+            ],
+        )
+        self.assertEqual(sum(mapped), len(data))
+
+    def test_tokenizer_incremental(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+
+        text = "alpha 1.x beta 2 gamma"
+        buffer = tokenizer.tokenizeAll(text)
+
+        for offset, removed, inserted in [
+            (8, 1, "5"),
+            (6, 0, "3"),
+            (12, 2, ""),
+            (0, 0, "z"),
+            (22, 0, "s"),
+            (16, 7, " ."),
+        ]:
+            edited = text[:offset] + inserted + text[offset + removed :]
+            expected = tokenizer.tokenizeAll(edited)
+            result = tokenizer.retokenize(buffer, offset, removed, inserted)
+
+            self.assertEqual(
+                [(token.key, token.data, token.start) for token in result],
+                [(token.key, token.data, token.start) for token in expected],
+            )
+            buffer, text = result, edited
+
+        self.assertEqual(
+            [token.data for token in buffer],
+            ["zalpha", "31.5", "ba", "2", ".", None],
+        )
+
+        # Only the rescanned characters are mapped, line numbers being shifted
+        text = "alpha 1.x\n" * 1000
+        buffer = tokenizer.tokenizeAll(text)
+        buffer[-1].line
+
+        mapped = []
+        classIds = tokenizer.table.classIds
+
+        def counted(data):
+            mapped.append(len(data))
+            return classIds(data)
+
+        tokenizer.table.classIds = counted
+
+        edited = text[:5006] + "\n2" + text[5008:]
+        result = tokenizer.retokenize(buffer, 5006, 2, "\n2")
+        self.assertLess(sum(mapped), len(text) // 4)
+        self.assertEqual(
+            [(token.key, token.start, token.line, token.column) for token in result],
+            [
+                (token.key, token.start, token.line, token.column)
+                for token in tokenizer.tokenizeAll(edited)
+            ],
+        )
+
+    def test_tokenizer_parallel(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r'"[^"]*"', "string")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+
+        text = 'alpha 1.x "beta 2\n gamma" 3.5\ndelta "" 4. epsilon\n' * 8
+        expected = [
+            (token.key, token.start, token.end) for token in tokenizer.tokenizeAll(text)
+        ]
+
+        for chunkSize, separator in [(7, None), (13, None), (20, "\n"), (64, " ")]:
+            result = tokenizer.tokenizeParallel(text, 2, chunkSize, separator)
+            self.assertEqual(
+                [(token.key, token.start, token.end) for token in result], expected
+            )
+
+        with self.assertRaises(Exception):
+            tokenizer.tokenizeParallel(text + '"', 2, 16)
+
+        # Workers only get the table, the skipper being applied once stitched if it
+        # can't be pickled
+        literal = "x" * 3000
+        builder.addRawPattern(literal, "literal", above={"id"})
+        tokenizer = builder.build("eof")
+        tokenizer.skipper = lambda token: token.key == "blank"
+
+        text = ("alpha " + literal + " 2.5\n") * 4
+        result = tokenizer.tokenizeParallel(text, 2, 1000, "\n", get_context("spawn"))
+        self.assertEqual(
+            [(token.key, token.start, token.end) for token in result],
+            [
+                (token.key, token.start, token.end)
+                for token in tokenizer.tokenizeAll(text)
+            ],
+        )
+
+    def test_tokenizer_save(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"if", "if", above={"id"})
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r'"[^"]*"', "string")
+        builder.addRawPattern(r"\s+", "blank")
+
+        tokenizer = builder.build("eof", skipped={"blank"}, keywords=True)
+        text = 'if iffy 1.x\n  "é\n2" 2.5 if.'
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tokenizer.bin")
+            tokenizer.save(path)
+
+            loaded = Tokenizer.load(path)
+            self.assertEqual(loaded.keys, tokenizer.keys)
+            self.assertEqual(loaded.keywords, {"id": {"if": "if"}})
+
+            # Accelerations are only detected on first bulk use, and the nodes are
+            # only rebuilt for the APIs needing them
+            self.assertIsNone(loaded.accelerations)
+            loaded.tokenizeAll(text)
+            self.assertIsNotNone(loaded.accelerations)
+            self.assertIsNone(loaded._nodes)
+            self.assertEqual(len(loaded.nodes), len(tokenizer.nodes))
+
+            for tokenize in [
+                lambda automaton: automaton.iterator(CharFlow.fromString(text)),
+                lambda automaton: automaton.tokenizeBytes(text.encode()),
+                lambda automaton: automaton.compiledIterator(text),
+            ]:
+                self.assertEqual(
+                    [(token.key, token.start, token.end) for token in tokenize(loaded)],
+                    [
+                        (token.key, token.start, token.end)
+                        for token in tokenize(tokenizer)
+                    ],
+                )
+
+            # Keys looked up by name
+            terminals = {name: (name,) for name in ["id", "if", "number", "dot"]}
+            terminals.update({"string": ("string",), "blank": ("blank",)})
+            loaded = Tokenizer.load(path, terminals, eof=("eof",))
+            self.assertEqual(
+                [token.key for token in loaded.tokenizeAll("if x")],
+                [("if",), ("id",), ("eof",)],
+            )
+
+            with open(path, "r+b") as stream:
+                stream.seek(4)
+                stream.write(bytes([0xFF]))
+            with self.assertRaises(Exception):
+                Tokenizer.load(path)
+
+        with self.assertRaises(Exception):
+            builder.buildLazy("eof").save(path)
+
+    def test_tokenizer_minimization(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"\p{Alpha}\w*", "id")
+        for keyword in ["if", "in", "int", "else", "elif", "while"]:
+            builder.addRawPattern(keyword, keyword, above={"id"})
+        builder.addRawPattern(r"0x|1x", "prefix")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"#[^\n]*\n", "comment", reluctant=True)
+
+        raw = builder.build("eof", minimized=False)
+        minimal = builder.build("eof")
+
+        self.assertLess(len(minimal.nodes), len(raw.nodes))
+        self.assertEqual(minimal.nodes[0].id, 0)
+
+        data = "if int elif x inta  while 0x 1x # if\n else"
+        self.assertEqual(
+            [
+                (token.key, token.data)
+                for token in raw.iterator(CharFlow.fromString(data))
+            ],
+            [
+                (token.key, token.data)
+                for token in minimal.iterator(CharFlow.fromString(data))
+            ],
+        )
+
+    def test_tokenizer_keywords(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z][a-z0-9]*", "id")
+        for keyword in ["if", "in", "int", "else", "elif"]:
+            builder.addRawPattern(keyword, keyword, above={"id"})
+        builder.addRawPattern(r"9", "nine", above={"number"})
+        builder.addRawPattern(r"[0-9]+", "number")
+        builder.addRawPattern(r"==", "eq")
+        builder.addRawPattern(r"\s+", "blank")
+
+        entries, keywords = builder.splitKeywords({"blank"})
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(keywords["number"], {"9": "nine"})
+        self.assertEqual(
+            keywords["id"],
+            {"if": "if", "in": "in", "int": "int", "else": "else", "elif": "elif"},
+        )
+
+        tokenizer = builder.build("eof", native=True, skipped={"blank"}, keywords=True)
+        reference = builder.build("eof", skipped={"blank"})
+        lazy = builder.buildLazy("eof", skipped={"blank"}, maxStates=3, keywords=True)
+        self.assertLess(len(tokenizer.nodes), len(reference.nodes))
+        self.assertEqual(reference.keywords, {})
+        self.assertEqual(builder.buildLazy("eof", skipped={"blank"}).keywords, {})
+
+        data = "if int2 == 9 elif elsewhere 99 in else"
+        expected = [
+            (token.key, token.data)
+            for token in reference.iterator(CharFlow.fromString(data))
+        ]
+        self.assertEqual(expected[:3], [("if", "if"), ("id", "int2"), ("eq", "==")])
+        self.assertEqual(expected[-1], ("eof", None))
+
+        for target in [tokenizer, lazy]:
+            for tokens in [
+                target.iterator(CharFlow.fromString(data)),
+                target.iterator(CharFlow(StringIO(data))),
+                target.tokenizeAll(data),
+                target.tokenizeBytes(data.encode()),
+                target.compiledIterator(data),
+                target.nativeIterator(data),
+            ]:
+                tokens = list(tokens)
+                self.assertEqual(
+                    [(token.key, token.data) for token in tokens], expected
+                )
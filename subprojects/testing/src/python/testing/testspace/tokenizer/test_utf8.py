@@ -0,0 +1,28 @@
+from itertools import product
+from unittest import TestCase
+
+from gammaparsing4py.tokenizer.regex import MAX_CODE_POINT
+from gammaparsing4py.tokenizer.utf8 import utf8Sequences
+
+
+class Test_UTF8(TestCase):
+
+    def test_sequences(self):
+        self.assertEqual(utf8Sequences(0x41, 0x5A), [[(0x41, 0x5A)]])
+        self.assertEqual(utf8Sequences(0x80, 0x7FF), [[(0xC2, 0xDF), (0x80, 0xBF)]])
+        self.assertEqual(len(utf8Sequences(0, MAX_CODE_POINT)), 9)
+
+        for start, end in [(0x7A, 0x100), (0xD700, 0xE0FF), (0xFFF0, 0x10420)]:
+            encoded = set(
+                bytes(sequence)
+                for ranges in utf8Sequences(start, end)
+                for sequence in product(*[range(low, high + 1) for low, high in ranges])
+            )
+            self.assertEqual(
+                encoded,
+                set(
+                    chr(code).encode("utf-8")
+                    for code in range(start, end + 1)
+                    if not 0xD800 <= code <= 0xDFFF
+                ),
+            )
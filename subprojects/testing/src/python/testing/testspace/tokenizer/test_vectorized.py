@@ -0,0 +1,61 @@
+from array import array
+from unittest import TestCase, skipIf
+
+from gammaparsing4py.core.charflow import CharFlow
+from gammaparsing4py.tokenizer.tokenizer import TokenizerBuilder
+from gammaparsing4py.tokenizer.vectorized import classIds, linePositions, numpy
+
+
+@skipIf(numpy is None, "NumPy is not installed")
+class Test_Vectorized(TestCase):
+
+    def test_class_ids(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"\s+", "blank")
+        builder.addRawPattern(r"\x{1F600}", "smiley")
+
+        tokenizer = builder.build("eof", skipped={"blank"})
+        table = tokenizer.table
+        text = "ab c\U0001F600é"
+
+        self.assertEqual(
+            list(classIds(table, text)), [table.classOf(ord(char)) for char in text]
+        )
+        self.assertEqual(
+            [token.key for token in tokenizer.vectorizedIterator(text[:-1])],
+            ["id", "id", "smiley", "eof"],
+        )
+
+    def test_line_positions(self):
+        text = "a\nbc\n\nd"
+        offsets = array("q", range(len(text) + 1))
+
+        lines, columns = linePositions(text, offsets)
+        self.assertEqual(lines, [0, 0, 1, 1, 1, 2, 3, 3])
+        self.assertEqual(columns, [0, 1, 0, 1, 2, 0, 0, 1])
+
+    def test_vectorized_iterator(self):
+        builder = TokenizerBuilder[str]()
+        builder.addRawPattern(r"[a-z]+", "id")
+        builder.addRawPattern(r"if", "if", above={"id"})
+        builder.addRawPattern(r"[0-9]+(\.[0-9]+)?", "number")
+        builder.addRawPattern(r"\.", "dot")
+        builder.addRawPattern(r'"[^"]*"', "string")
+        builder.addRawPattern(r"\s+", "blank")
+
+        for tokenizer in [
+            builder.build("eof", skipped={"blank"}),
+            builder.buildLazy("eof", skipped={"blank"}),
+        ]:
+            text = 'if iffy 1.x\n  "é\n2" 2.5 if.\n'
+            self.assertEqual(
+                [
+                    (token.key, token.data, token.line, token.column)
+                    for token in tokenizer.vectorizedIterator(text)
+                ],
+                [
+                    (token.key, token.data, token.line, token.column)
+                    for token in tokenizer.iterator(CharFlow.fromString(text))
+                ],
+            )